@@ -8,4 +8,11 @@ QLOO_API_URL="https://hackathon.api.qloo.com"
 
 # Application Settings
 APP_ENV=development
-LOG_LEVEL=INFO
\ No newline at end of file
+LOG_LEVEL=INFO
+
+# LLM provider: "openai" or "local" (deterministic offline stand-in)
+LLM_PROVIDER=openai
+LOCAL_LLM_LATENCY_MS=300
+LOCAL_LLM_LATENCY_DISTRIBUTION=lognormal
+LOCAL_LLM_ERROR_RATE=0
+LOCAL_LLM_TRUNCATE_RATE=0
@@ -2,6 +2,16 @@ from fastapi import APIRouter
 from models.schemas import HealthResponse
 from datetime import datetime
 from core.configuration.config import settings
+from services.openai_service import (
+    get_llm_cache_stats,
+    get_llm_rate_limit_stats,
+    get_openai_pool_stats,
+    llm_breaker,
+)
+from services.hf_space import get_hf_pool_stats, hf_breaker
+from services.qloo_service import get_qloo_cache_stats, qloo_breaker
+from services.render_pool import get_render_pool_stats
+from services.result_cache import get_result_cache_stats
 
 router = APIRouter()
 
@@ -12,5 +22,17 @@ async def health_check():
         timestamp=datetime.utcnow().isoformat(),
         version="3.0.0",
         qloo_connected=bool(settings.QLOO_API_KEY),
-        openai_connected=bool(settings.OPENAI_API_KEY)
+        openai_connected=bool(settings.OPENAI_API_KEY),
+        openai_pool=get_openai_pool_stats(),
+        llm_rate_limit=get_llm_rate_limit_stats(),
+        result_cache=get_result_cache_stats(),
+        llm_cache=get_llm_cache_stats(),
+        qloo_cache=get_qloo_cache_stats(),
+        circuit_breakers={
+            "llm": llm_breaker.snapshot(),
+            "qloo": qloo_breaker.snapshot(),
+            "hf_space": hf_breaker.snapshot(),
+        },
+        hf_space_pool=get_hf_pool_stats(),
+        render_pool=get_render_pool_stats(),
     )
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+from models.schemas import JobStatusResponse, ProductInput
+from services.job_service import JobCapacityError, job_store
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/jobs/generate-targeting", response_model=JobStatusResponse, status_code=202
+)
+async def create_targeting_job(product_input: ProductInput):
+    """Start the targeting pipeline in the background and return its job ID"""
+    try:
+        job = job_store.create(product_input)
+    except JobCapacityError as e:
+        logger.warning(f"Rejecting targeting job: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_response()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_targeting_job(job_id: str):
+    """Status, per-stage progress and (once completed) the final result"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_response()
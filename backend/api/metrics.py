@@ -0,0 +1,144 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import List
+from services.generator import targeting_flights
+from services.openai_service import (
+    get_llm_cache_stats,
+    get_llm_rate_limit_stats,
+    get_openai_pool_stats,
+    llm_breaker,
+)
+from services.hf_space import get_hf_pool_stats, hf_breaker
+from services.qloo_service import get_qloo_cache_stats, qloo_breaker
+from services.render_pool import get_render_pool_stats
+from services.result_cache import get_result_cache_stats
+from services.visual_store import get_visual_store_stats
+from utils.metrics import registry
+
+router = APIRouter()
+
+
+def collect_cache_metrics() -> List[str]:
+    caches = {
+        "result": get_result_cache_stats(),
+        "llm": get_llm_cache_stats(),
+        "qloo": get_qloo_cache_stats(),
+        "visual": get_visual_store_stats(),
+    }
+    lines = []
+    for metric, key, kind, help_text in [
+        ("tastetarget_cache_hits_total", "hits", "counter", "Cache hits"),
+        ("tastetarget_cache_misses_total", "misses", "counter", "Cache misses"),
+        ("tastetarget_cache_hit_ratio", "hit_rate", "gauge", "Cache hit ratio"),
+        ("tastetarget_cache_entries", "size", "gauge", "Cached entries"),
+    ]:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for cache, stats in caches.items():
+            if key in stats:
+                lines.append(f'{metric}{{cache="{cache}"}} {stats[key]}')
+    return lines
+
+
+def collect_pool_metrics() -> List[str]:
+    stats = get_openai_pool_stats()
+    return [
+        "# HELP tastetarget_openai_in_flight LLM calls currently in flight",
+        "# TYPE tastetarget_openai_in_flight gauge",
+        f"tastetarget_openai_in_flight {stats['in_flight']}",
+        "# HELP tastetarget_llm_slot_queue_depth LLM calls waiting for a concurrency slot",
+        "# TYPE tastetarget_llm_slot_queue_depth gauge",
+        f"tastetarget_llm_slot_queue_depth {stats['waiting']}",
+        "# HELP tastetarget_openai_pool_saturated_total Calls that queued with every slot taken",
+        "# TYPE tastetarget_openai_pool_saturated_total counter",
+        f"tastetarget_openai_pool_saturated_total {stats['saturated_calls']}",
+    ]
+
+
+def collect_rate_limit_metrics() -> List[str]:
+    stats = get_llm_rate_limit_stats()
+    return [
+        "# HELP tastetarget_llm_rate_limit_queue_depth LLM calls waiting for rate budget",
+        "# TYPE tastetarget_llm_rate_limit_queue_depth gauge",
+        f"tastetarget_llm_rate_limit_queue_depth {stats['queue_depth']}",
+        "# HELP tastetarget_llm_rate_limit_pauses_total Queue pauses after a 429",
+        "# TYPE tastetarget_llm_rate_limit_pauses_total counter",
+        f"tastetarget_llm_rate_limit_pauses_total {stats['pauses']}",
+    ]
+
+
+def collect_hf_pool_metrics() -> List[str]:
+    stats = get_hf_pool_stats()
+    return [
+        "# HELP tastetarget_hf_pool_clients Pooled HF Space clients by state",
+        "# TYPE tastetarget_hf_pool_clients gauge",
+        f'tastetarget_hf_pool_clients{{state="live"}} {stats["live"]}',
+        f'tastetarget_hf_pool_clients{{state="idle"}} {stats["idle"]}',
+        "# HELP tastetarget_hf_pool_recycled_total HF Space clients recycled",
+        "# TYPE tastetarget_hf_pool_recycled_total counter",
+        f"tastetarget_hf_pool_recycled_total {stats['recycled']}",
+    ]
+
+
+def collect_render_pool_metrics() -> List[str]:
+    stats = get_render_pool_stats()
+    return [
+        "# HELP tastetarget_render_pool_jobs Render jobs by state",
+        "# TYPE tastetarget_render_pool_jobs gauge",
+        f'tastetarget_render_pool_jobs{{state="running"}} {stats["running"]}',
+        f'tastetarget_render_pool_jobs{{state="queued"}} {stats["queued"]}',
+        "# HELP tastetarget_render_pool_utilization Share of render workers busy",
+        "# TYPE tastetarget_render_pool_utilization gauge",
+        f"tastetarget_render_pool_utilization {stats['utilization']}",
+        "# HELP tastetarget_render_pool_busy_seconds_total Worker time spent rendering",
+        "# TYPE tastetarget_render_pool_busy_seconds_total counter",
+        f"tastetarget_render_pool_busy_seconds_total {stats['busy_seconds']}",
+        "# HELP tastetarget_render_pool_rejected_total Render jobs rejected (queue full)",
+        "# TYPE tastetarget_render_pool_rejected_total counter",
+        f"tastetarget_render_pool_rejected_total {stats['rejected']}",
+    ]
+
+
+def collect_breaker_metrics() -> List[str]:
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    lines = [
+        "# HELP tastetarget_circuit_breaker_state 0=closed, 1=half_open, 2=open",
+        "# TYPE tastetarget_circuit_breaker_state gauge",
+    ]
+    for breaker in (llm_breaker, qloo_breaker, hf_breaker):
+        lines.append(
+            f'tastetarget_circuit_breaker_state{{upstream="{breaker.name}"}} '
+            f"{states[breaker.state]}"
+        )
+    return lines
+
+
+def collect_singleflight_metrics() -> List[str]:
+    stats = targeting_flights.snapshot()
+    return [
+        "# HELP tastetarget_singleflight_in_flight Shared pipeline runs in flight",
+        "# TYPE tastetarget_singleflight_in_flight gauge",
+        f"tastetarget_singleflight_in_flight {stats['in_flight']}",
+        "# HELP tastetarget_singleflight_requests_total Requests that started "
+        "(leader) or joined (follower) a pipeline run",
+        "# TYPE tastetarget_singleflight_requests_total counter",
+        f'tastetarget_singleflight_requests_total{{role="leader"}} {stats["leaders"]}',
+        f'tastetarget_singleflight_requests_total{{role="follower"}} '
+        f"{stats['followers']}",
+    ]
+
+
+registry.add_collector(collect_cache_metrics)
+registry.add_collector(collect_breaker_metrics)
+registry.add_collector(collect_pool_metrics)
+registry.add_collector(collect_rate_limit_metrics)
+registry.add_collector(collect_hf_pool_metrics)
+registry.add_collector(collect_render_pool_metrics)
+registry.add_collector(collect_singleflight_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of the in-process metrics"""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from models.schemas import ProductInput, TasteTargetResponse
-from services.qloo_service import call_qloo_api
+from core.configuration.config import settings
 from services.generator import (
-    generate_personas_with_openai,
-    generate_campaign_copy_with_openai,
-    generate_suggestions,
+    run_coalesced_targeting,
+    run_targeting_batch,
+    stream_targeting_events,
 )
-from datetime import datetime
-from core.configuration.config import settings
+from services.result_cache import get_cached_response
+from utils.timing import span
+from typing import List
+import json
 import logging
 
 # NEW IMPORT: Import the router from your visual_generation module
 from . import (
+    jobs,
     visual_generation,
 )  # Assuming visual_generation.py is in the same 'api' directory
 
@@ -20,31 +25,95 @@ logger = logging.getLogger(__name__)
 
 # Include the router from visual_generation.py here
 router.include_router(visual_generation.router)
+router.include_router(jobs.router)
 
 
 @router.post("/generate-targeting", response_model=TasteTargetResponse)
 async def generate_targeting(product_input: ProductInput):
     try:
         logger.info(f"Generating targeting for product: {product_input.product_name}")
-        taste_clusters = await call_qloo_api(product_input.dict())
-        personas = await generate_personas_with_openai(product_input, taste_clusters)
-        campaign_copies = await generate_campaign_copy_with_openai(
-            product_input, personas
-        )
-        suggestions = await generate_suggestions(product_input, personas)
-
-        return TasteTargetResponse(
-            product_name=product_input.product_name,
-            personas=personas,
-            campaign_copies=campaign_copies,
-            generation_timestamp=datetime.utcnow().isoformat(),
-            suggestions=suggestions,
-            data_source=(
-                "Qloo Taste AI + OpenAI GPT-4"
-                if settings.QLOO_API_KEY
-                else "OpenAI GPT-4 (Mock Qloo)"
-            ),
-        )
+        cached = await get_cached_response(product_input)
+        if cached:
+            response = cached
+        else:
+            response = await run_coalesced_targeting(product_input)
+
+        with span("serialize"):
+            return JSONResponse(content=jsonable_encoder(response))
     except Exception as e:
         logger.error(f"Error generating targeting: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/generate-targeting/stream")
+async def generate_targeting_stream(product_input: ProductInput):
+    """Server-Sent Events variant of /generate-targeting.
+
+    Emits ``clusters``, one ``persona`` and ``copy`` event per persona as they
+    finish, then ``suggestions`` and a final ``done`` event carrying the full
+    TasteTargetResponse. Failures are reported as an ``error`` event.
+    """
+    logger.info(
+        f"Streaming targeting for product: {product_input.product_name}"
+    )
+
+    async def event_stream():
+        try:
+            async for event, data in stream_targeting_events(product_input):
+                yield format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Error streaming targeting: {e}", exc_info=True)
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/generate-targeting/batch")
+async def generate_targeting_batch(products: List[ProductInput]):
+    """Targeting for a list of products, streamed as NDJSON.
+
+    Emits one line per product as it finishes (in completion order, with its
+    ``index`` in the request): ``{"index", "product_name", "status": "ok",
+    "result"}`` or ``{"index", "product_name", "status": "error", "error"}``,
+    then a final ``{"status": "done", "total", "succeeded", "failed"}`` line.
+    """
+    if len(products) > settings.BATCH_MAX_PRODUCTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(products)} products "
+            f"(max {settings.BATCH_MAX_PRODUCTS})",
+        )
+    logger.info(f"Batch targeting for {len(products)} products")
+
+    async def ndjson_stream():
+        failed = 0
+        async for index, response, error in run_targeting_batch(products):
+            line = {"index": index, "product_name": products[index].product_name}
+            if response is not None:
+                line.update(status="ok", result=jsonable_encoder(response))
+            else:
+                failed += 1
+                line.update(status="error", error=error)
+            yield json.dumps(line) + "\n"
+        yield json.dumps(
+            {
+                "status": "done",
+                "total": len(products),
+                "succeeded": len(products) - failed,
+                "failed": failed,
+            }
+        ) + "\n"
+
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+    )
@@ -1,426 +1,206 @@
 # External packages
-from fastapi import APIRouter, UploadFile, File, Form
-from PIL import Image, ImageDraw, ImageFont
+from fastapi import APIRouter, Header, HTTPException, Query, UploadFile, File, Form
 
 # ... (all other imports from your original code)
-import io
-import math
-from httpx import Client
-from gradio_client import Client
-import asyncio
 import os
-import base64
 import logging
 import shutil
 import uuid
+from typing import Literal, Optional, Tuple, Union
 
 # Local or project imports
 from core.configuration.config import settings
 from models.schemas import VisualGenerationRequest
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from services.hf_space import hf_pool
+from services.render_pool import RenderPoolFull, render_pool
+from services.visual_renderer import (
+    as_base64,
+    available_formats,
+    read_image,
+    render_image,
+    transcode_image,
+)
+from services.visual_store import get_visual, store_visual
+from utils.negotiation import negotiate
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-# Your existing code for generate_visual and generate_cultural_visual goes here
-@router.post("/generate-visual")
-async def generate_visual(request: VisualGenerationRequest):
-    """Generate marketing visual using Hugging Face Space"""
-    # [Your existing code remains exactly the same]
-    try:
-        logger.info(f"Generating visual for persona: {request.persona_name}")
+FORMAT_ALIASES = {"jpg": "jpeg"}
+VISUAL_URL_PREFIX = "/api/visuals"
 
-        # Try to use the Hugging Face Space first
-        try:
-            # Initialize Gradio client for your Space
-            logger.info(f"Attempting to use Hugging Face Space for visual generation")
-
-            client = Client("Samkelo28/taste-target-visual-generator")
-
-            # Call the Space with your parameters
-            result = await asyncio.to_thread(
-                client.predict,
-                request.persona_name,
-                request.brand_values,
-                request.product_description,
-                request.style_preference,
-                request.image_type,
-                api_name="/predict",
-            )
 
-            # The result should be a file path to the generated image
-            if result and isinstance(result, str) and os.path.exists(result):
-                # Read the image file and convert to base64
-                with open(result, "rb") as img_file:
-                    img_data = img_file.read()
-                    img_base64 = base64.b64encode(img_data).decode("utf-8")
+async def produce_visual(
+    request: VisualGenerationRequest,
+    image_format: str = "png",
+    quality: int = 90,
+    encoded: bool = False,
+) -> Tuple[Union[bytes, str], bool]:
+    """Encoded image (base64 text when ``encoded``) from the Hugging Face
+    Space, falling back to the local renderer. The second value is True when
+    the Space produced it."""
+
+    def run(job, *args):
+        if encoded:
+            return render_pool.run(as_base64, job, *args)
+        return render_pool.run(job, *args)
+
+    # Try to use the Hugging Face Space first
+    try:
+        logger.info(f"Attempting to use Hugging Face Space for visual generation")
+
+        # Pooled, pre-warmed client; the predict runs under a deadline
+        result = await hf_pool.predict(
+            request.persona_name,
+            request.brand_values,
+            request.product_description,
+            request.style_preference,
+            request.image_type,
+            api_name="/predict",
+        )
 
+        # The result should be a file path to the generated image
+        if result and isinstance(result, str) and os.path.exists(result):
+            try:
+                data = await run(read_image, result, image_format, quality)
+            finally:
                 # Clean up the temporary file
                 try:
                     os.remove(result)
-                except:
+                except OSError:
                     pass
-
-                logger.info(f"Successfully generated visual for {request.persona_name}")
-
-                return {
-                    "status": "success",
-                    "image_data": f"data:image/png;base64,{img_base64}",
-                    "message": "Visual generated successfully with AI",
-                }
-            else:
-                raise Exception("Invalid result from Hugging Face Space")
-
-        except Exception as hf_error:
-            logger.warning(f"Hugging Face Space error: {str(hf_error)}")
-            logger.info("Falling back to local generation")
-
-            # Create a high-quality placeholder based on style
-            width, height = 512, 512
-
-            # Style-specific colors and designs
-            style_configs = {
-                "minimalist clean": {
-                    "bg_color": (250, 250, 250),
-                    "accent_color": (0, 0, 0),
-                    "text_color": (0, 0, 0),
-                    "font_size": 24,
-                },
-                "bold vibrant": {
-                    "bg_color": (255, 0, 128),
-                    "accent_color": (0, 255, 255),
-                    "text_color": (255, 255, 255),
-                    "font_size": 32,
-                },
-                "luxury premium": {
-                    "bg_color": (20, 20, 20),
-                    "accent_color": (218, 165, 32),
-                    "text_color": (218, 165, 32),
-                    "font_size": 28,
-                },
-                "natural organic": {
-                    "bg_color": (245, 245, 220),
-                    "accent_color": (34, 139, 34),
-                    "text_color": (34, 139, 34),
-                    "font_size": 26,
-                },
-                "tech futuristic": {
-                    "bg_color": (10, 10, 50),
-                    "accent_color": (0, 255, 255),
-                    "text_color": (0, 255, 255),
-                    "font_size": 30,
-                },
-                "artistic creative": {
-                    "bg_color": (255, 245, 238),
-                    "accent_color": (255, 69, 0),
-                    "text_color": (139, 69, 19),
-                    "font_size": 28,
-                },
-            }
-
-            config = style_configs.get(
-                request.style_preference, style_configs["minimalist clean"]
+            return data, True
+        raise Exception("Invalid result from Hugging Face Space")
+
+    except RenderPoolFull:
+        raise
+    except Exception as hf_error:
+        logger.warning(f"Hugging Face Space error: {str(hf_error)}")
+        logger.info("Falling back to local generation")
+
+        # Render and encode on the render pool so the event loop keeps
+        # serving other requests
+        return await run(render_image, request, image_format, quality), False
+
+
+def choose_format(accept: Optional[str], requested: Optional[str]) -> str:
+    """Output format from the ``format`` query parameter, else the Accept header"""
+    formats = available_formats()
+    if requested:
+        name = FORMAT_ALIASES.get(requested.lower(), requested.lower())
+        if name not in formats:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format '{requested}', use one of: "
+                + ", ".join(formats),
             )
+        return name
+    name = negotiate(accept, formats)
+    if name is None:
+        raise HTTPException(
+            status_code=406,
+            detail="Acceptable image types: " + ", ".join(formats.values()),
+        )
+    return name
 
-            # Create image with anti-aliasing
-            img = Image.new("RGBA", (width, height), (*config["bg_color"], 255))
-            draw = ImageDraw.Draw(img)
-
-            # Generate logo design based on type
-            if request.image_type == "logo":
-                # Extract brand initials
-                brand_name = request.product_description.strip()
-                initials = "".join([word[0].upper() for word in brand_name.split()[:2]])
-                if not initials:
-                    initials = brand_name[:2].upper()
-
-                # Create logo based on style
-                if request.style_preference == "minimalist clean":
-                    # Circular logo with initials
-                    draw.ellipse(
-                        [156, 156, 356, 356], outline=config["accent_color"], width=4
-                    )
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    bbox = draw.textbbox((0, 0), initials, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                    draw.text(
-                        (256 - text_width // 2, 256 - text_height // 2),
-                        initials,
-                        fill=config["accent_color"],
-                        font=font,
-                    )
-
-                elif request.style_preference == "bold vibrant":
-                    # Gradient-style square logo
-                    for i in range(100):
-                        alpha = int(255 * (1 - i / 100))
-                        color = (*config["accent_color"], alpha)
-                        draw.rectangle(
-                            [156 + i, 156 + i, 356 - i, 356 - i], outline=color, width=2
-                        )
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 60
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    draw.text(
-                        (256, 256),
-                        initials,
-                        fill=config["text_color"],
-                        font=font,
-                        anchor="mm",
-                    )
-
-                elif request.style_preference == "luxury premium":
-                    # Diamond shape with gold accent
-                    points = [(256, 106), (406, 256), (256, 406), (106, 256)]
-                    draw.polygon(points, outline=config["accent_color"], width=3)
-                    # Inner diamond
-                    inner_points = [(256, 156), (356, 256), (256, 356), (156, 256)]
-                    draw.polygon(inner_points, outline=config["accent_color"], width=2)
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf", 42
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    draw.text(
-                        (256, 256),
-                        initials,
-                        fill=config["accent_color"],
-                        font=font,
-                        anchor="mm",
-                    )
-
-                elif request.style_preference == "natural organic":
-                    # Leaf-inspired logo
-                    # Draw leaf shapes
-                    for angle in range(0, 360, 45):
-                        x = 256 + 80 * (angle % 90) / 90
-                        y = 256 - 80 * (angle % 90) / 90
-                        draw.arc(
-                            [x - 40, y - 40, x + 40, y + 40],
-                            angle,
-                            angle + 90,
-                            fill=config["accent_color"],
-                            width=3,
-                        )
-                    # Center circle
-                    draw.ellipse(
-                        [226, 226, 286, 286],
-                        fill=config["bg_color"],
-                        outline=config["accent_color"],
-                        width=3,
-                    )
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 36
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    draw.text(
-                        (256, 256),
-                        initials,
-                        fill=config["accent_color"],
-                        font=font,
-                        anchor="mm",
-                    )
-
-                elif request.style_preference == "tech futuristic":
-                    # Hexagon tech logo
-                    hex_points = []
-                    for i in range(6):
-                        angle = i * 60 * math.pi / 180
-                        x = 256 + 100 * math.cos(angle)
-                        y = 256 + 100 * math.sin(angle)
-                        hex_points.append((x, y))
-                    draw.polygon(hex_points, outline=config["accent_color"], width=3)
-                    # Inner hex
-                    inner_hex = []
-                    for i in range(6):
-                        angle = i * 60 * math.pi / 180
-                        x = 256 + 60 * math.cos(angle)
-                        y = 256 + 60 * math.sin(angle)
-                        inner_hex.append((x, y))
-                    draw.polygon(inner_hex, outline=config["accent_color"], width=2)
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    draw.text(
-                        (256, 256),
-                        initials,
-                        fill=config["accent_color"],
-                        font=font,
-                        anchor="mm",
-                    )
-
-                else:  # artistic creative
-                    # Abstract artistic logo
-                    import random
-
-                    random.seed(hash(brand_name))
-                    for _ in range(8):
-                        x1 = random.randint(156, 256)
-                        y1 = random.randint(156, 256)
-                        x2 = random.randint(256, 356)
-                        y2 = random.randint(256, 356)
-                        draw.arc(
-                            [x1, y1, x2, y2],
-                            0,
-                            180,
-                            fill=config["accent_color"],
-                            width=3,
-                        )
-                    try:
-                        font = ImageFont.truetype(
-                            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 54
-                        )
-                    except:
-                        font = ImageFont.load_default()
-                    draw.text(
-                        (256, 256),
-                        initials,
-                        fill=config["accent_color"],
-                        font=font,
-                        anchor="mm",
-                    )
-
-                # Add brand name below logo
-                try:
-                    small_font = ImageFont.truetype(
-                        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 18
-                    )
-                except:
-                    small_font = ImageFont.load_default()
-
-                draw.text(
-                    (256, 420),
-                    brand_name,
-                    fill=config["text_color"],
-                    font=small_font,
-                    anchor="mt",
-                )
 
-            else:
-                # Marketing visual generation (existing code)
-                if request.style_preference == "minimalist clean":
-                    draw.ellipse(
-                        [156, 156, 356, 356], outline=config["accent_color"], width=3
-                    )
-                elif request.style_preference == "bold vibrant":
-                    draw.rectangle([100, 100, 300, 300], fill=config["accent_color"])
-                    draw.ellipse([212, 212, 412, 412], fill=config["bg_color"])
-                elif request.style_preference == "luxury premium":
-                    draw.rectangle([106, 206, 406, 306], fill=config["accent_color"])
-                elif request.style_preference == "natural organic":
-                    for i in range(5):
-                        x = 256 + i * 30 - 60
-                        y = 256 + i * 20 - 40
-                        draw.ellipse(
-                            [x - 50, y - 20, x + 50, y + 20],
-                            fill=config["accent_color"],
-                        )
-                elif request.style_preference == "tech futuristic":
-                    for i in range(0, width, 50):
-                        draw.line(
-                            [(i, 0), (i, height)], fill=config["accent_color"], width=1
-                        )
-                        draw.line(
-                            [(0, i), (width, i)], fill=config["accent_color"], width=1
-                        )
-                else:
-                    draw.arc(
-                        [100, 100, 400, 400],
-                        0,
-                        270,
-                        fill=config["accent_color"],
-                        width=5,
-                    )
-
-                # Add text
-                try:
-                    font = ImageFont.truetype(
-                        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                        config["font_size"],
-                    )
-                except:
-                    font = ImageFont.load_default()
-
-                text = request.persona_name
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_x = (width - text_width) // 2
-                draw.text(
-                    (text_x, height - 80), text, fill=config["text_color"], font=font
-                )
+def image_response(data: bytes, image_format: str, headers: dict) -> Response:
+    return Response(
+        content=data,
+        media_type=available_formats()[image_format],
+        headers={"Vary": "Accept", **headers},
+    )
 
-                product_text = (
-                    request.product_description[:30] + "..."
-                    if len(request.product_description) > 30
-                    else request.product_description
-                )
-                try:
-                    small_font = ImageFont.truetype(
-                        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16
-                    )
-                except:
-                    small_font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), product_text, font=small_font)
-                text_width = bbox[2] - bbox[0]
-                text_x = (width - text_width) // 2
-                draw.text(
-                    (text_x, height - 50),
-                    product_text,
-                    fill=config["text_color"],
-                    font=small_font,
-                )
 
-            # Add TasteTarget watermark for marketing visuals only
-            if request.image_type != "logo":
-                watermark = "TasteTarget AI"
-                bbox = draw.textbbox((0, 0), watermark, font=small_font)
-                draw.text(
-                    (10, height - 20),
-                    watermark,
-                    fill=config["text_color"],
-                    font=small_font,
-                )
+@router.post("/generate-visual")
+async def generate_visual(
+    request: VisualGenerationRequest, delivery: Literal["inline", "url"] = "inline"
+):
+    """Generate marketing visual using Hugging Face Space
+
+    ``delivery=url`` returns an ``image_url`` (GET /api/visuals/{id}, any
+    format) instead of an inline base64 data URI.
+    """
+    try:
+        logger.info(f"Generating visual for persona: {request.persona_name}")
 
-            # Convert to base64
-            img_buffer = io.BytesIO()
-            img.save(img_buffer, format="PNG", quality=95)
-            img_buffer.seek(0)
-            img_base64 = base64.b64encode(img_buffer.read()).decode("utf-8")
+        if delivery == "url":
+            png, from_space = await produce_visual(request)
+            image = {"image_url": f"{VISUAL_URL_PREFIX}/{store_visual(png)}"}
+        else:
+            img_base64, from_space = await produce_visual(request, encoded=True)
+            image = {"image_data": f"data:image/png;base64,{img_base64}"}
 
+        if from_space:
+            logger.info(f"Successfully generated visual for {request.persona_name}")
+            message = "Visual generated successfully with AI"
+        else:
             message = (
                 "Logo generated successfully"
                 if request.image_type == "logo"
                 else "Visual generated successfully"
             )
+            message = f"{message} (local generation)"
 
-            return {
-                "status": "success",
-                "image_data": f"data:image/png;base64,{img_base64}",
-                "message": f"{message} (local generation)",
-            }
+        return {"status": "success", **image, "message": message}
 
+    except RenderPoolFull as e:
+        logger.warning(f"Rejecting visual generation: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Visual generation error: {str(e)}")
         return {"status": "error", "message": f"Failed to generate visual: {str(e)}"}
 
 
+@router.post("/generate-visual/image")
+async def generate_visual_image(
+    request: VisualGenerationRequest,
+    accept: Optional[str] = Header(None),
+    image_format: Optional[str] = Query(None, alias="format"),
+    quality: int = Query(settings.IMAGE_QUALITY, ge=1, le=100),
+):
+    """Generate a visual and return the raw image (PNG, WebP or JPEG, chosen
+    by ``format`` or the Accept header; ``quality`` applies to WebP/JPEG)"""
+    chosen = choose_format(accept, image_format)
+    try:
+        data, from_space = await produce_visual(request, chosen, quality)
+    except RenderPoolFull as e:
+        logger.warning(f"Rejecting visual generation: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Visual generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate visual: {e}")
+    return image_response(
+        data, chosen, {"X-Visual-Source": "ai" if from_space else "local"}
+    )
+
+
+@router.get("/visuals/{visual_id}")
+async def get_visual_image(
+    visual_id: str,
+    accept: Optional[str] = Header(None),
+    image_format: Optional[str] = Query(None, alias="format"),
+    quality: int = Query(settings.IMAGE_QUALITY, ge=1, le=100),
+):
+    """A visual stored by ``/generate-visual?delivery=url``, in the negotiated format"""
+    png = get_visual(visual_id)
+    if png is None:
+        raise HTTPException(status_code=404, detail="Visual not found or expired")
+    chosen = choose_format(accept, image_format)
+    if chosen != "png":
+        try:
+            png = await render_pool.run(transcode_image, png, chosen, quality)
+        except RenderPoolFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return image_response(
+        png,
+        chosen,
+        {"Cache-Control": f"private, max-age={int(settings.VISUAL_STORE_TTL)}"},
+    )
+
+
 @router.post("/generate-cultural-visual")
 async def generate_cultural_visual(request: dict):
     """Generate visuals that incorporate cultural insights from Qloo data"""
@@ -514,6 +294,8 @@ async def generate_cultural_visual(request: dict):
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Cultural visual generation error: {str(e)}")
         import traceback
@@ -0,0 +1,119 @@
+"""Benchmark per-cluster vs batched persona generation.
+
+Stubs call_openai_api with a simulated LLM whose latency is a fixed
+round-trip cost plus a per-output-token cost, then compares wall time,
+number of calls and prompt size for both persona modes.
+
+Run from the backend directory:
+    python -m benchmarks.persona_modes --runs 20
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+from typing import List
+
+from models.schemas import ProductInput
+from services import generator
+from services.qloo_service import mock_qloo_api
+
+PERSONA_TOKENS = 200
+
+
+class SimulatedLLM:
+    """Stand-in for call_openai_api that records calls and prompt sizes"""
+
+    def __init__(self, round_trip: float, per_token: float):
+        self.round_trip = round_trip
+        self.per_token = per_token
+        self.calls = 0
+        self.prompt_chars = 0
+
+    async def __call__(self, prompt: str, temperature: float = 0.7, **kwargs) -> str:
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+
+        cluster_ids = re.findall(r"cluster_id: (\S+)", prompt)
+        if cluster_ids:
+            # JSON mode only returns objects, so the batch comes wrapped
+            payload = {
+                "personas": [self._persona(cluster_id) for cluster_id in cluster_ids]
+            }
+        else:
+            payload = self._persona("single")
+
+        await asyncio.sleep(
+            self.round_trip
+            + self.per_token * PERSONA_TOKENS * max(1, len(cluster_ids))
+        )
+        return json.dumps(payload)
+
+    @staticmethod
+    def _persona(cluster_id: str) -> dict:
+        return {
+            "cluster_id": cluster_id,
+            "persona_name": "The Benchmark Persona",
+            "description": "A simulated persona.",
+            "psychographics": ["curious", "modern", "conscious", "social", "bold"],
+            "preferred_channels": ["Instagram", "Email", "YouTube", "TikTok"],
+            "influencer_types": ["Experts", "Creators", "Peers"],
+        }
+
+
+async def run_mode(
+    mode: str, runs: int, round_trip: float, per_token: float
+) -> dict:
+    llm = SimulatedLLM(round_trip, per_token)
+    original = generator.call_openai_api
+    generator.call_openai_api = llm
+
+    product_input = ProductInput(
+        product_name="EcoBottle",
+        product_description="A reusable smart water bottle that tracks hydration.",
+        brand_values=["sustainability", "innovation", "quality"],
+    )
+    taste_clusters = await mock_qloo_api(product_input.dict())
+
+    timings: List[float] = []
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            await generator.generate_personas_with_openai(
+                product_input, taste_clusters, mode=mode
+            )
+            timings.append(time.perf_counter() - start)
+    finally:
+        generator.call_openai_api = original
+
+    return {
+        "mode": mode,
+        "clusters": len(taste_clusters),
+        "runs": runs,
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "calls_per_run": llm.calls / runs,
+        "prompt_chars_per_run": llm.prompt_chars / runs,
+    }
+
+
+async def main(runs: int, round_trip: float, per_token: float):
+    results = []
+    for mode in generator.PERSONA_MODES:
+        results.append(await run_mode(mode, runs, round_trip, per_token))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--round-trip", type=float, default=0.4, help="Seconds per LLM call"
+    )
+    parser.add_argument(
+        "--per-token", type=float, default=0.002, help="Seconds per output token"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.round_trip, args.per_token))
@@ -0,0 +1,246 @@
+"""In-process benchmark suite for the targeting pipeline.
+
+Drives generate_targeting, call_qloo_api, convert_qloo_insights_to_cluster,
+extract_json_from_response and generate_suggestions against stubbed
+upstreams that simulate latency (the local LLM provider and a mock Qloo
+transport), at several concurrency levels. Reports p50/p95/p99 latency and
+throughput, writes the results to JSON and optionally compares them with a
+saved baseline.
+
+Run from the backend directory:
+    python -m benchmarks.pipeline --output bench.json
+    python -m benchmarks.pipeline --baseline bench.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from api import routes
+from models.schemas import ProductInput
+from services import openai_service, qloo_service, result_cache
+from services.generator import generate_suggestions, run_targeting_pipeline
+from services.llm_providers import LocalProvider
+from services.openai_service import extract_json_from_response
+from services.qloo_service import call_qloo_api, convert_qloo_insights_to_cluster
+from utils.cache import TTLCache
+from utils.rate_limit import RateLimitScheduler
+
+CONCURRENCY_LEVELS = [1, 8, 32, 128]
+
+PRODUCT_INPUT = ProductInput(
+    product_name="EcoBottle",
+    product_description="A reusable smart water bottle that tracks hydration.",
+    brand_values=["sustainability", "innovation", "quality"],
+    campaign_tone="balanced",
+)
+
+QLOO_INSIGHTS = {
+    "data": [
+        {"category": category, "name": f"{category} item {i}"}
+        for i, category in enumerate(
+            ["music", "book", "restaurant", "destination", "brand"] * 2
+        )
+    ]
+}
+
+LLM_RESPONSE = (
+    '```json\n{"persona_name": "The Benchmark Persona", "description": "d", '
+    '"psychographics": ["a", "b"], "preferred_channels": ["c"], '
+    '"influencer_types": ["d"]}\n```'
+)
+
+
+def install_stubs(llm_latency_ms: float, qloo_latency_ms: float, seed: int):
+    """Replace every upstream with an in-process simulation and turn the
+    caches off so each operation exercises the full path"""
+    openai_service.set_llm_provider(
+        LocalProvider(latency_ms=llm_latency_ms, distribution="lognormal", seed=seed)
+    )
+    openai_service.llm_cache = None
+    openai_service.llm_scheduler = RateLimitScheduler("llm", 0, 0)
+    result_cache.result_cache = None
+
+    rng = random.Random(seed)
+
+    async def qloo_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(rng.lognormvariate(0, 0.4) * qloo_latency_ms / 1000)
+        return httpx.Response(200, json=QLOO_INSIGHTS)
+
+    qloo_service.QLOO_API_KEY = "benchmark"
+    qloo_service.qloo_cache = TTLCache(max_entries=0)
+    qloo_service.http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(qloo_handler)
+    )
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = int(round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def run_level(
+    operation: Callable[[], Awaitable], concurrency: int, requests: int
+) -> dict:
+    """Run ``requests`` operations with ``concurrency`` workers"""
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await operation()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def build_cases(personas: list) -> Dict[str, Callable]:
+    counter = itertools.count()
+
+    async def generate_targeting():
+        # A distinct product per call so identical in-flight requests are
+        # not coalesced into one pipeline run
+        await routes.generate_targeting(
+            PRODUCT_INPUT.copy(
+                update={"product_name": f"EcoBottle {next(counter)}"}
+            )
+        )
+
+    async def qloo():
+        await call_qloo_api(PRODUCT_INPUT.dict())
+
+    async def convert():
+        convert_qloo_insights_to_cluster(QLOO_INSIGHTS, "sustainability", 0)
+
+    async def extract():
+        extract_json_from_response(LLM_RESPONSE)
+
+    async def suggestions():
+        await generate_suggestions(PRODUCT_INPUT, personas)
+
+    return {
+        "generate_targeting": generate_targeting,
+        "call_qloo_api": qloo,
+        "convert_qloo_insights_to_cluster": convert,
+        "extract_json_from_response": extract,
+        "generate_suggestions": suggestions,
+    }
+
+
+async def run_suite(args) -> dict:
+    install_stubs(args.llm_latency_ms, args.qloo_latency_ms, args.seed)
+    response = await run_targeting_pipeline(PRODUCT_INPUT)
+    cases = build_cases(response.personas)
+
+    results = {}
+    for name, operation in cases.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = []
+        for concurrency in args.concurrency:
+            requests = max(args.requests, concurrency)
+            level = await run_level(operation, concurrency, requests)
+            results[name].append(level)
+            print(
+                f"{name:<34} c={concurrency:<4} p50={level['p50_ms']:>9.2f}ms "
+                f"p95={level['p95_ms']:>9.2f}ms p99={level['p99_ms']:>9.2f}ms "
+                f"{level['throughput_rps']:>10.1f} req/s",
+                file=sys.stderr,
+            )
+
+    return {
+        "config": {
+            "llm_latency_ms": args.llm_latency_ms,
+            "qloo_latency_ms": args.qloo_latency_ms,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions worse than ``tolerance`` (fractional) versus the baseline"""
+    regressions = []
+    for name, levels in current["results"].items():
+        baseline_levels = {
+            level["concurrency"]: level for level in baseline["results"].get(name, [])
+        }
+        for level in levels:
+            base = baseline_levels.get(level["concurrency"])
+            if not base:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                if base[metric] and level[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} c={level['concurrency']} {metric}: "
+                        f"{base[metric]} -> {level[metric]}"
+                    )
+            if base["throughput_rps"] and level["throughput_rps"] < base[
+                "throughput_rps"
+            ] * (1 - tolerance):
+                regressions.append(
+                    f"{name} c={level['concurrency']} throughput_rps: "
+                    f"{base['throughput_rps']} -> {level['throughput_rps']}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Saved results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS
+    )
+    parser.add_argument("--only", nargs="+", help="Benchmark names to run")
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--qloo-latency-ms", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
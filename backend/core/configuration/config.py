@@ -18,4 +18,110 @@ class Settings:
     APP_ENV = os.getenv("APP_ENV", "development")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+    # LLM provider: "openai", or "local" for the deterministic offline stand-in
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+    LOCAL_LLM_LATENCY_MS = float(os.getenv("LOCAL_LLM_LATENCY_MS", "300"))
+    # "fixed", "uniform" or "lognormal"
+    LOCAL_LLM_LATENCY_DISTRIBUTION = os.getenv(
+        "LOCAL_LLM_LATENCY_DISTRIBUTION", "lognormal"
+    )
+    LOCAL_LLM_LATENCY_SPREAD = float(os.getenv("LOCAL_LLM_LATENCY_SPREAD", "0.5"))
+    LOCAL_LLM_ERROR_RATE = float(os.getenv("LOCAL_LLM_ERROR_RATE", "0"))
+    LOCAL_LLM_ERROR_STATUS = int(os.getenv("LOCAL_LLM_ERROR_STATUS", "503"))
+    # Share of local responses cut short, as if they hit max_tokens
+    LOCAL_LLM_TRUNCATE_RATE = float(os.getenv("LOCAL_LLM_TRUNCATE_RATE", "0"))
+    LOCAL_LLM_SEED = int(os.getenv("LOCAL_LLM_SEED", "0"))
+
+    # OpenAI connection pool
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    # Process-wide cap on concurrent LLM calls (single, stream, jobs and
+    # batch alike); further calls queue instead of timing out in the pool
+    LLM_MAX_CONCURRENCY = int(
+        os.getenv("LLM_MAX_CONCURRENCY", str(OPENAI_MAX_CONNECTIONS))
+    )
+
+    # Process-wide LLM rate limits (0 disables a limit); a 429 without a
+    # Retry-After header pauses the queue for LLM_RATE_LIMIT_PAUSE seconds
+    LLM_RATE_LIMIT_RPM = int(os.getenv("LLM_RATE_LIMIT_RPM", "500"))
+    LLM_RATE_LIMIT_TPM = int(os.getenv("LLM_RATE_LIMIT_TPM", "200000"))
+    LLM_RATE_LIMIT_PAUSE = float(os.getenv("LLM_RATE_LIMIT_PAUSE", "1"))
+
+    # Retries (jittered exponential backoff) and per-upstream circuit breakers
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    QLOO_MAX_RETRIES = int(os.getenv("QLOO_MAX_RETRIES", "1"))
+    RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "4"))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+    # Completion token budgets per call type, and prompt compaction
+    TOKEN_BUDGET_PERSONA = int(os.getenv("TOKEN_BUDGET_PERSONA", "300"))
+    TOKEN_BUDGET_COPY = int(os.getenv("TOKEN_BUDGET_COPY", "400"))
+    TOKEN_BUDGET_DEFAULT = int(os.getenv("TOKEN_BUDGET_DEFAULT", "1000"))
+    PROMPT_DESCRIPTION_MAX_TOKENS = int(
+        os.getenv("PROMPT_DESCRIPTION_MAX_TOKENS", "150")
+    )
+
+    # Generation pipeline
+    PERSONA_CONCURRENCY = int(os.getenv("PERSONA_CONCURRENCY", "4"))
+    PERSONA_MODE = os.getenv("PERSONA_MODE", "per_cluster")
+
+    # Background targeting jobs
+    JOBS_MAX_ACTIVE = int(os.getenv("JOBS_MAX_ACTIVE", "32"))
+    JOBS_MAX_STORED = int(os.getenv("JOBS_MAX_STORED", "1000"))
+    JOBS_TTL = float(os.getenv("JOBS_TTL", "3600"))
+
+    # Batch targeting: products per request and products processed at once
+    BATCH_MAX_PRODUCTS = int(os.getenv("BATCH_MAX_PRODUCTS", "500"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+    # Targeting result cache: "memory", "disk" or "off"
+    RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+    RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", ".cache/results")
+
+    # Qloo client: per-request timeout and an overall deadline for the stage
+    QLOO_TIMEOUT = float(os.getenv("QLOO_TIMEOUT", "15"))
+    QLOO_STAGE_DEADLINE = float(os.getenv("QLOO_STAGE_DEADLINE", "15"))
+    QLOO_MAX_CONNECTIONS = int(os.getenv("QLOO_MAX_CONNECTIONS", "20"))
+
+    # Qloo insights cache
+    QLOO_CACHE_TTL = float(os.getenv("QLOO_CACHE_TTL", "21600"))
+    QLOO_CACHE_MAX_ENTRIES = int(os.getenv("QLOO_CACHE_MAX_ENTRIES", "512"))
+
+    # Persistent LLM prompt/response cache (only for calls that opt in)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    # Highest temperature whose output may be reused; the default 0 limits the
+    # cache to deterministic calls
+    LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", "50000000"))
+
+    # Hugging Face Space visual generator: pooled, pre-warmed Gradio clients
+    HF_SPACE_ID = os.getenv("HF_SPACE_ID", "Samkelo28/taste-target-visual-generator")
+    HF_POOL_SIZE = int(os.getenv("HF_POOL_SIZE", "2"))
+    HF_POOL_WARMUP = os.getenv("HF_POOL_WARMUP", "true").lower() == "true"
+    HF_POOL_ACQUIRE_TIMEOUT = float(os.getenv("HF_POOL_ACQUIRE_TIMEOUT", "10"))
+    HF_PREDICT_DEADLINE = float(os.getenv("HF_PREDICT_DEADLINE", "60"))
+    HF_CLIENT_MAX_USES = int(os.getenv("HF_CLIENT_MAX_USES", "500"))
+    HF_HEALTH_CHECK_INTERVAL = float(os.getenv("HF_HEALTH_CHECK_INTERVAL", "60"))
+
+    # Local image rendering runs off the event loop on a bounded pool
+    # ("thread" or "process"); jobs beyond workers + queue are rejected
+    RENDER_POOL_KIND = os.getenv("RENDER_POOL_KIND", "thread").lower()
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+    RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", "32"))
+    # Generated visuals kept for GET /api/visuals/{id} (delivery=url)
+    VISUAL_STORE_TTL = float(os.getenv("VISUAL_STORE_TTL", "3600"))
+    VISUAL_STORE_MAX_ENTRIES = int(os.getenv("VISUAL_STORE_MAX_ENTRIES", "256"))
+    # Default WebP/JPEG quality for binary image responses
+    IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+    # Event-loop lag probe interval in seconds (0 disables it)
+    EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
 settings = Settings()
@@ -1,17 +1,55 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from core.configuration.config import settings
 from utils.logger import configure_logging
-from api import routes, health
+from api import routes, health, metrics
+from services.openai_service import init_openai_client, close_openai_client
+from services.qloo_service import init_qloo_client, close_qloo_client
+from services.hf_space import hf_pool
+from services.job_service import job_store
+from services.render_pool import render_pool
+from services.visual_renderer import warm_renderer
+from utils.loop_monitor import LoopLagMonitor
+from utils.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+from utils.timing import format_server_timing, start_request_timing
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import time
 
 # Setup logging
 configure_logging()
 
+# Reports event-loop blocking as tastetarget_event_loop_lag_seconds
+loop_monitor = LoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared upstream clients live for the whole app
+    init_openai_client()
+    init_qloo_client()
+    await hf_pool.start(warm=settings.HF_POOL_WARMUP)
+    # Fonts and base layers for the local renderer fallback
+    await asyncio.to_thread(warm_renderer)
+    render_pool.start()
+    loop_monitor.start()
+    yield
+    await loop_monitor.close()
+    await job_store.shutdown()
+    render_pool.close()
+    await hf_pool.close()
+    await close_openai_client()
+    await close_qloo_client()
+
+
 # FastAPI instance
 app = FastAPI(
     title="TasteTarget API - Qloo + OpenAI",
     description="AI-Powered Cultural Targeting",
     version="3.0.0",
+    lifespan=lifespan,
 )
 
 # CORS config
@@ -23,9 +61,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Expose the stage spans recorded during the request as Server-Timing"""
+    spans = start_request_timing()
+    start = time.perf_counter()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = format_server_timing(
+        spans, (time.perf_counter() - start) * 1000
+    )
+    return response
+
+
+def route_template(request: Request) -> str:
+    """Matched route path (e.g. /api/jobs/{job_id}) to keep label cardinality low"""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Request latency and in-flight gauges per route.
+
+    Pure ASGI rather than @app.middleware("http"): the app call only returns
+    once the whole body has been sent, so streamed responses (SSE, NDJSON
+    batches) are measured to their last byte, not just to their headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        route = route_template(request)
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(route=route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(route=route)
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=route,
+                status=status,
+            )
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
+
 # Register routers
 app.include_router(routes.router, prefix="/api")
 app.include_router(health.router)
+app.include_router(metrics.router)
 
 # Uvicorn run
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 
 class ProductInput(BaseModel):
     product_name: str
@@ -7,6 +7,11 @@ class ProductInput(BaseModel):
     brand_values: List[str] = []
     target_mood: List[str] = []
     campaign_tone: str = "balanced"
+    # "per_cluster" or "batched"; None uses Settings.PERSONA_MODE
+    persona_mode: Optional[str] = None
+    # Skip the result and LLM cache lookups and recompute (results are still
+    # stored)
+    bypass_cache: bool = False
 
 class VisualGenerationRequest(BaseModel):
     persona_name: str
@@ -40,6 +45,17 @@ class TasteTargetResponse(BaseModel):
     suggestions: Dict[str, List[str]]
     data_source: str = Field(default="Qloo Taste AI + OpenAI GPT-4")
     visual_generation_endpoint: str = "https://huggingface.co/spaces/Samkelo28/taste-target-visual-generator"
+    cached: bool = False
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # queued | running | completed | failed
+    progress: Dict[str, Any]
+    result: Optional[TasteTargetResponse] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
 
 
 class HealthResponse(BaseModel):
@@ -48,3 +64,11 @@ class HealthResponse(BaseModel):
     version: str
     qloo_connected: bool
     openai_connected: bool
+    openai_pool: Dict[str, Any] = {}
+    llm_rate_limit: Dict[str, Any] = {}
+    result_cache: Dict[str, Any] = {}
+    llm_cache: Dict[str, Any] = {}
+    qloo_cache: Dict[str, Any] = {}
+    circuit_breakers: Dict[str, Any] = {}
+    hf_space_pool: Dict[str, Any] = {}
+    render_pool: Dict[str, Any] = {}
@@ -1,10 +1,38 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 from core.configuration.config import settings
-from services.openai_service import call_openai_api, extract_json_from_response
+from services.openai_service import (
+    call_openai_api,
+    extract_json_from_response,
+    extract_json_array_from_response,
+    is_clean_json,
+    parse_structured_response,
+)
 from models.schemas import ProductInput, TasteTargetResponse, TastePersona, CampaignCopy
 from services.qloo_service import call_qloo_api
-from typing import List, Dict, Optional, Union, Any
+from services.result_cache import (
+    get_cached_response,
+    make_result_cache_key,
+    store_response,
+)
+from utils.json_stream import missing_fields, validate_fields
+from utils.fallbacks import record_fallback, start_fallback_tracking
+from utils.singleflight import SingleFlight
+from utils.timing import annotate_span, span
+from utils.tokens import compact_text
+from typing import (
+    List,
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+)
+from pydantic import ValidationError
 import logging
 
 router = APIRouter()
@@ -15,23 +43,13 @@ logger = logging.getLogger(__name__)
 async def generate_targeting(product_input: ProductInput):
     try:
         taste_clusters = await call_qloo_api(product_input.dict())
-        personas = await generate_personas_with_openai(product_input, taste_clusters)
-        campaign_copies = await generate_campaign_copy_with_openai(
-            product_input, personas
+        personas, campaign_copies = await generate_personas_and_copies(
+            product_input, taste_clusters
         )
         suggestions = await generate_suggestions(product_input, personas)
 
-        return TasteTargetResponse(
-            product_name=product_input.product_name,
-            personas=personas,
-            campaign_copies=campaign_copies,
-            generation_timestamp=datetime.utcnow().isoformat(),
-            suggestions=suggestions,
-            data_source=(
-                "Qloo Taste AI + OpenAI GPT-4"
-                if settings.QLOO_API_KEY
-                else "OpenAI GPT-4 (Mock Qloo)"
-            ),
+        return build_targeting_response(
+            product_input, personas, campaign_copies, suggestions
         )
 
     except Exception as e:
@@ -42,22 +60,249 @@ async def generate_targeting(product_input: ProductInput):
 
 
 # Persona Generation with OpenAI
+PERSONA_MODES = ("per_cluster", "batched")
+
+
+def resolve_persona_mode(product_input: ProductInput) -> str:
+    """Pick the persona mode from the request, falling back to settings"""
+    mode = product_input.persona_mode or settings.PERSONA_MODE
+    if mode not in PERSONA_MODES:
+        logger.warning(f"Unknown persona mode '{mode}', using per_cluster")
+        return "per_cluster"
+    return mode
+
+
 async def generate_personas_with_openai(
+    product_input: ProductInput,
+    taste_clusters: List[dict],
+    mode: Optional[str] = None,
+) -> List[TastePersona]:
+    """Generate personas using OpenAI GPT-4, one concurrent call per cluster
+    or a single batched call for all clusters"""
+    if (mode or resolve_persona_mode(product_input)) == "batched":
+        return await generate_personas_batched(product_input, taste_clusters)
+
+    semaphore = asyncio.Semaphore(max(1, settings.PERSONA_CONCURRENCY))
+
+    async def bounded(cluster: dict, index: int) -> TastePersona:
+        async with semaphore:
+            return await generate_persona_for_cluster(product_input, cluster, index)
+
+    # gather keeps the cluster order regardless of completion order
+    return list(
+        await asyncio.gather(
+            *(bounded(cluster, i) for i, cluster in enumerate(taste_clusters))
+        )
+    )
+
+
+def compact_description(product_input: ProductInput) -> str:
+    """Product description trimmed to the prompt budget"""
+    return compact_text(
+        product_input.product_description, settings.PROMPT_DESCRIPTION_MAX_TOKENS
+    )
+
+
+def summarize_cluster_interests(cluster: dict) -> str:
+    """Compact one-line summary of a cluster's top interests"""
+    return "; ".join(
+        f"{category}: {', '.join(items[:3])}"
+        for category, items in cluster["interests"].items()
+    )
+
+
+# LLM output fields checked before building TastePersona / CampaignCopy.
+# The required fields must have come through whole; any other field that is
+# missing or mistyped (e.g. cut off by a truncated response) is filled with a
+# default instead of discarding the whole response
+PERSONA_FIELDS = {
+    "persona_name": str,
+    "description": str,
+    "psychographics": list,
+    "preferred_channels": list,
+    "influencer_types": list,
+}
+COPY_FIELDS = {
+    name: str for name in CampaignCopy.model_fields if name != "persona_id"
+}
+PERSONA_REQUIRED_FIELDS = ("persona_name", "description")
+COPY_REQUIRED_FIELDS = ("tagline", "social_caption", "ad_copy")
+
+
+def is_valid_persona_response(response: str) -> bool:
+    """Only complete responses that yield a real persona may be cached"""
+    data = extract_json_from_response(response)
+    return is_clean_json(response) and bool(data.get("persona_name"))
+
+
+def is_valid_persona_array_response(response: str, expected: int) -> bool:
+    items = extract_json_array_from_response(response)
+    return (
+        is_clean_json(response)
+        and len(items) == expected
+        and all(isinstance(item, dict) and item.get("persona_name") for item in items)
+    )
+
+
+def is_valid_copy_response(response: str) -> bool:
+    data = extract_json_from_response(response)
+    return is_clean_json(response) and bool(data.get("tagline"))
+
+
+def note_defaulted_fields(subject: str, fields: List[str]):
+    """Log and annotate fields filled with defaults after a salvaged parse"""
+    if fields:
+        logger.info(f"{subject} salvaged, defaulting {', '.join(fields)}")
+        annotate_span(defaulted=",".join(fields))
+
+
+def build_persona(
+    cluster: dict, index: int, persona_data: Any
+) -> Optional[TastePersona]:
+    """Build a persona from LLM output, or None when the data is unusable"""
+    if not isinstance(persona_data, dict):
+        return None
+    persona_data = validate_fields(persona_data, PERSONA_FIELDS)
+    missing = missing_fields(persona_data, PERSONA_REQUIRED_FIELDS)
+    if missing:
+        logger.warning(
+            f"Persona for {cluster['cluster_id']} is missing {', '.join(missing)}"
+        )
+        return None
+    note_defaulted_fields(
+        f"Persona for {cluster['cluster_id']}",
+        missing_fields(persona_data, PERSONA_FIELDS),
+    )
+    try:
+        return TastePersona(
+            persona_id=cluster["cluster_id"],
+            name=persona_data["persona_name"],
+            description=persona_data["description"],
+            cultural_interests=cluster["interests"],
+            psychographics=persona_data.get(
+                "psychographics", ["innovative", "conscious", "modern"]
+            ),
+            preferred_channels=persona_data.get(
+                "preferred_channels", ["Instagram", "Email", "YouTube"]
+            ),
+            influencer_types=persona_data.get(
+                "influencer_types", ["Micro-influencers", "Experts"]
+            ),
+        )
+    except ValidationError as e:
+        logger.warning(f"Invalid persona fields for {cluster['cluster_id']}: {e}")
+        return None
+
+
+async def generate_personas_batched(
     product_input: ProductInput, taste_clusters: List[dict]
 ) -> List[TastePersona]:
-    """Generate personas using OpenAI GPT-4"""
-    personas = []
+    """Generate every persona in one OpenAI call.
+
+    The shared product header is sent once and the model returns a JSON
+    object holding one persona per cluster. Each element is validated on its
+    own; only the broken ones are retried individually (which falls back on
+    failure).
+    """
+    if not taste_clusters:
+        return []
+
+    cluster_lines = "\n".join(
+        f"- cluster_id: {cluster['cluster_id']} | {summarize_cluster_interests(cluster)}"
+        for cluster in taste_clusters
+    )
+
+    prompt = f"""Create one detailed marketing persona per taste cluster for {product_input.product_name}.
+
+Product: {compact_description(product_input)}
+Brand values: {', '.join(product_input.brand_values)}
+Taste clusters from data:
+{cluster_lines}
+
+Generate a JSON object with a "personas" array of exactly {len(taste_clusters)} objects, in the same order as the clusters, each with exactly these fields:
+{{
+  "cluster_id": "The cluster_id this persona belongs to",
+  "persona_name": "Creative 2-3 word name that captures their essence",
+  "description": "2-3 sentence description of who they are and what drives them",
+  "psychographics": ["trait1", "trait2", "trait3", "trait4", "trait5"],
+  "preferred_channels": ["channel1", "channel2", "channel3", "channel4"],
+  "influencer_types": ["type1", "type2", "type3"]
+}}
+
+Important: Return ONLY the JSON object, no other text or markdown."""
 
+    items: List[Any] = []
+    try:
+        with span("persona_batch", label=len(taste_clusters)) as stage:
+            response = await call_openai_api(
+                prompt,
+                temperature=0.7,
+                max_tokens=settings.TOKEN_BUDGET_PERSONA * len(taste_clusters),
+                call_type="persona_batch",
+                json_mode=True,
+                bypass_cache=product_input.bypass_cache,
+                cache_if=lambda text: is_valid_persona_array_response(
+                    text, len(taste_clusters)
+                ),
+            )
+            # The wrapper, its list and the last persona may be cut short,
+            # never a list inside a persona
+            data, stage.attrs["parse"] = parse_structured_response(
+                response, "persona_batch", openers="{", max_open=3
+            )
+            if isinstance(data, dict):
+                data = data.get("personas")
+            items = data if isinstance(data, list) else []
+            stage.attrs["valid"] = sum(
+                1
+                for item in items
+                if isinstance(item, dict) and item.get("persona_name")
+            )
+    except Exception as e:
+        logger.error(f"Batched persona generation error: {e}")
+
+    by_cluster_id = {
+        item.get("cluster_id"): item
+        for item in items
+        if isinstance(item, dict) and item.get("cluster_id")
+    }
+
+    personas: List[Optional[TastePersona]] = []
     for i, cluster in enumerate(taste_clusters):
-        interests_summary = []
-        for category, items in cluster["interests"].items():
-            interests_summary.append(f"{category}: {', '.join(items[:3])}")
+        persona_data = by_cluster_id.get(cluster["cluster_id"])
+        if persona_data is None and i < len(items):
+            persona_data = items[i]
+        personas.append(build_persona(cluster, i, persona_data))
+
+    broken = [i for i, persona in enumerate(personas) if persona is None]
+    if broken:
+        logger.warning(
+            f"Batched persona call returned {len(broken)} unusable entries, retrying them"
+        )
+        semaphore = asyncio.Semaphore(max(1, settings.PERSONA_CONCURRENCY))
 
-        prompt = f"""Create a detailed marketing persona for {product_input.product_name}.
+        async def retry(index: int) -> TastePersona:
+            async with semaphore:
+                return await generate_persona_for_cluster(
+                    product_input, taste_clusters[index], index
+                )
 
-Product: {product_input.product_description}
+        retried = await asyncio.gather(*(retry(i) for i in broken))
+        for index, persona in zip(broken, retried):
+            personas[index] = persona
+
+    return personas
+
+
+async def generate_persona_for_cluster(
+    product_input: ProductInput, cluster: dict, index: int
+) -> TastePersona:
+    """Generate a single persona for one taste cluster, falling back on failure"""
+    prompt = f"""Create a detailed marketing persona for {product_input.product_name}.
+
+Product: {compact_description(product_input)}
 Brand values: {', '.join(product_input.brand_values)}
-Cultural interests from data: {'; '.join(interests_summary)}
+Cultural interests from data: {summarize_cluster_interests(cluster)}
 
 Generate a JSON object with exactly these fields:
 {{
@@ -70,45 +315,37 @@ Generate a JSON object with exactly these fields:
 
 Important: Return ONLY the JSON object, no other text or markdown."""
 
+    with span("persona", label=cluster["cluster_id"]) as stage:
         try:
-            response = await call_openai_api(prompt, temperature=0.7)
-            persona_data = extract_json_from_response(response)
-
-            if persona_data and "persona_name" in persona_data:
-                personas.append(
-                    TastePersona(
-                        persona_id=cluster["cluster_id"],
-                        name=persona_data.get("persona_name", f"Persona {i+1}"),
-                        description=persona_data.get(
-                            "description", "A key customer segment"
-                        ),
-                        cultural_interests=cluster["interests"],
-                        psychographics=persona_data.get(
-                            "psychographics", ["innovative", "conscious", "modern"]
-                        ),
-                        preferred_channels=persona_data.get(
-                            "preferred_channels", ["Instagram", "Email", "YouTube"]
-                        ),
-                        influencer_types=persona_data.get(
-                            "influencer_types", ["Micro-influencers", "Experts"]
-                        ),
-                    )
-                )
-                logger.info(
-                    f"Successfully generated persona: {persona_data.get('persona_name')}"
-                )
+            response = await call_openai_api(
+                prompt,
+                temperature=0.7,
+                cache_if=is_valid_persona_response,
+                call_type="persona",
+                json_mode=True,
+                bypass_cache=product_input.bypass_cache,
+            )
+            persona_data, stage.attrs["parse"] = parse_structured_response(
+                response, "persona", openers="{", max_open=1
+            )
+
+            persona = build_persona(cluster, index, persona_data)
+            if persona:
+                logger.info(f"Successfully generated persona: {persona.name}")
+                stage.attrs["fallback"] = False
+                return persona
             else:
                 raise ValueError("Invalid persona data from OpenAI")
 
         except Exception as e:
             logger.error(f"Persona generation error: {e}")
-            personas.append(create_fallback_persona(cluster, i))
-
-    return personas
+            stage.attrs["fallback"] = True
+            return create_fallback_persona(cluster, index)
 
 
 def create_fallback_persona(cluster: dict, index: int) -> TastePersona:
     """Fallback persona when generation fails"""
+    record_fallback("persona")
     names = {
         "eco_conscious": "The Conscious Pioneer",
         "tech_innovator": "The Digital Explorer",
@@ -133,26 +370,37 @@ def create_fallback_persona(cluster: dict, index: int) -> TastePersona:
     )
 
 
+TONE_GUIDE = {
+    "minimal": "Use few words, be direct and impactful",
+    "balanced": "Professional yet approachable tone",
+    "expressive": "Creative and emotionally engaging",
+    "bold": "Strong statements and confident messaging",
+}
+
+
 async def generate_campaign_copy_with_openai(
     product_input: ProductInput, personas: List[TastePersona]
 ) -> List[CampaignCopy]:
-    """Generate campaign copy using OpenAI"""
-    copies = []
-
-    tone_guide = {
-        "minimal": "Use few words, be direct and impactful",
-        "balanced": "Professional yet approachable tone",
-        "expressive": "Creative and emotionally engaging",
-        "bold": "Strong statements and confident messaging",
-    }
+    """Generate campaign copy using OpenAI, one concurrent call per persona"""
+    semaphore = asyncio.Semaphore(max(1, settings.PERSONA_CONCURRENCY))
 
-    for persona in personas:
-        prompt = f"""Create marketing copy for {product_input.product_name} targeting {persona.name}.
+    async def bounded(persona: TastePersona) -> CampaignCopy:
+        async with semaphore:
+            return await generate_copy_for_persona(product_input, persona)
+
+    return list(await asyncio.gather(*(bounded(persona) for persona in personas)))
+
+
+async def generate_copy_for_persona(
+    product_input: ProductInput, persona: TastePersona
+) -> CampaignCopy:
+    """Generate campaign copy for a single persona, falling back on failure"""
+    prompt = f"""Create marketing copy for {product_input.product_name} targeting {persona.name}.
 
-Product: {product_input.product_description}
+Product: {compact_description(product_input)}
 Customer Profile: {persona.description}
 Their interests include: {', '.join(persona.cultural_interests.get('music', [])[:2])} music, {', '.join(persona.cultural_interests.get('fashion', [])[:2])} fashion
-Tone: {product_input.campaign_tone} - {tone_guide.get(product_input.campaign_tone, 'balanced')}
+Tone: {product_input.campaign_tone} - {TONE_GUIDE.get(product_input.campaign_tone, 'balanced')}
 
 Generate a JSON object with exactly these fields:
 {{
@@ -165,45 +413,282 @@ Generate a JSON object with exactly these fields:
 
 Important: Return ONLY the JSON object, no other text or markdown."""
 
+    with span("copy", label=persona.persona_id) as stage:
         try:
-            response = await call_openai_api(prompt, temperature=0.8)
-            copy_data = extract_json_from_response(response)
-
-            if copy_data and "tagline" in copy_data:
-                copies.append(
-                    CampaignCopy(
-                        persona_id=persona.persona_id,
-                        tagline=copy_data.get("tagline", "Experience the difference"),
-                        social_caption=copy_data.get(
-                            "social_caption",
-                            f"Discover {product_input.product_name} ✨",
-                        ),
-                        ad_copy=copy_data.get(
-                            "ad_copy", "Transform your everyday experience."
-                        ),
-                        email_subject=copy_data.get(
-                            "email_subject", "Something special awaits"
-                        ),
-                        product_description=copy_data.get(
-                            "product_description", product_input.product_description
-                        ),
-                    )
+            response = await call_openai_api(
+                prompt,
+                temperature=0.8,
+                cache_if=is_valid_copy_response,
+                call_type="copy",
+                json_mode=True,
+                bypass_cache=product_input.bypass_cache,
+            )
+            copy_data, stage.attrs["parse"] = parse_structured_response(
+                response, "copy", openers="{", max_open=1
+            )
+            if isinstance(copy_data, dict):
+                copy_data = validate_fields(copy_data, COPY_FIELDS)
+
+            if isinstance(copy_data, dict) and not missing_fields(
+                copy_data, COPY_REQUIRED_FIELDS
+            ):
+                note_defaulted_fields(
+                    f"Copy for {persona.persona_id}",
+                    missing_fields(copy_data, COPY_FIELDS),
+                )
+                copy = CampaignCopy(
+                    persona_id=persona.persona_id,
+                    tagline=copy_data["tagline"],
+                    social_caption=copy_data["social_caption"],
+                    ad_copy=copy_data["ad_copy"],
+                    email_subject=copy_data.get(
+                        "email_subject", "Something special awaits"
+                    ),
+                    product_description=copy_data.get(
+                        "product_description", product_input.product_description
+                    ),
                 )
                 logger.info(f"Successfully generated copy for: {persona.name}")
+                stage.attrs["fallback"] = False
+                return copy
             else:
                 raise ValueError("Invalid copy data from OpenAI")
 
         except Exception as e:
             logger.error(f"Copy generation error: {e}")
-            copies.append(create_fallback_copy(product_input, persona))
+            stage.attrs["fallback"] = True
+            return create_fallback_copy(product_input, persona)
+
+
+async def generate_personas_and_copies(
+    product_input: ProductInput,
+    taste_clusters: List[dict],
+    on_persona: Optional[Callable[[TastePersona], Awaitable[None]]] = None,
+    on_copy: Optional[Callable[[CampaignCopy], Awaitable[None]]] = None,
+) -> Tuple[List[TastePersona], List[CampaignCopy]]:
+    """Pipeline persona -> copy per cluster so a slow persona never holds up
+    copy generation for the others.
+
+    ``on_persona`` and ``on_copy`` are awaited as soon as each result is ready,
+    which lets callers stream partial results.
+    """
+    if resolve_persona_mode(product_input) == "batched":
+        personas = await generate_personas_batched(product_input, taste_clusters)
+        if on_persona:
+            for persona in personas:
+                await on_persona(persona)
+
+        semaphore = asyncio.Semaphore(max(1, settings.PERSONA_CONCURRENCY))
+
+        async def copy_stage(persona: TastePersona) -> CampaignCopy:
+            async with semaphore:
+                copy = await generate_copy_for_persona(product_input, persona)
+            if on_copy:
+                await on_copy(copy)
+            return copy
+
+        copies = await asyncio.gather(*(copy_stage(persona) for persona in personas))
+        return personas, list(copies)
+
+    semaphore = asyncio.Semaphore(max(1, settings.PERSONA_CONCURRENCY))
+
+    async def pipeline(cluster: dict, index: int) -> Tuple[TastePersona, CampaignCopy]:
+        async with semaphore:
+            persona = await generate_persona_for_cluster(product_input, cluster, index)
+        if on_persona:
+            await on_persona(persona)
+        async with semaphore:
+            copy = await generate_copy_for_persona(product_input, persona)
+        if on_copy:
+            await on_copy(copy)
+        return persona, copy
+
+    results = await asyncio.gather(
+        *(pipeline(cluster, i) for i, cluster in enumerate(taste_clusters))
+    )
+    personas = [persona for persona, _ in results]
+    copies = [copy for _, copy in results]
+    return personas, copies
+
+
+async def run_targeting_pipeline(product_input: ProductInput) -> TasteTargetResponse:
+    """Qloo clusters -> personas and copies -> suggestions, uncached"""
+    with span("qloo"):
+        taste_clusters = await call_qloo_api(product_input.dict())
+    personas, campaign_copies = await generate_personas_and_copies(
+        product_input, taste_clusters
+    )
+    with span("suggestions"):
+        suggestions = await generate_suggestions(product_input, personas)
+    return build_targeting_response(
+        product_input, personas, campaign_copies, suggestions
+    )
+
+
+async def store_if_complete(
+    product_input: ProductInput, response: TasteTargetResponse, fallbacks: List[str]
+):
+    """Cache a result only if no stage fell back, so an upstream outage is not
+    served from the cache after the upstream recovers"""
+    if fallbacks:
+        logger.info(
+            f"Not caching degraded targeting for {product_input.product_name} "
+            f"(fallbacks: {', '.join(sorted(set(fallbacks)))})"
+        )
+        return
+    await store_response(product_input, response)
+
+
+targeting_flights: SingleFlight[TasteTargetResponse] = SingleFlight(
+    "generate_targeting"
+)
+
+
+async def run_coalesced_targeting(product_input: ProductInput) -> TasteTargetResponse:
+    """Run the pipeline and cache its result, once per set of identical
+    concurrent requests (keyed like the result cache)"""
+
+    async def compute() -> TasteTargetResponse:
+        fallbacks = start_fallback_tracking()
+        response = await run_targeting_pipeline(product_input)
+        await store_if_complete(product_input, response, fallbacks)
+        return response
+
+    return await targeting_flights.do(make_result_cache_key(product_input), compute)
+
+
+async def run_targeting_batch(
+    products: List[ProductInput],
+) -> AsyncIterator[Tuple[int, Optional[TasteTargetResponse], Optional[str]]]:
+    """Run targeting for many products, yielding (index, response, error) in
+    completion order.
+
+    At most BATCH_CONCURRENCY products run at once. Identical products share
+    one run, Qloo lookups shared between products are deduplicated by
+    fetch_qloo_insights, and every LLM call queues on the process-wide limit
+    in call_openai_api.
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+
+    async def run_one(
+        index: int, product_input: ProductInput
+    ) -> Tuple[int, Optional[TasteTargetResponse], Optional[str]]:
+        async with semaphore:
+            try:
+                response = await get_cached_response(
+                    product_input
+                ) or await run_coalesced_targeting(product_input)
+                return index, response, None
+            except Exception as e:
+                logger.error(
+                    f"Batch targeting failed for {product_input.product_name}: {e}"
+                )
+                return index, None, str(e)
 
-    return copies
+    tasks = [
+        asyncio.create_task(run_one(i, product_input))
+        for i, product_input in enumerate(products)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: drop the products that have not finished
+        for task in tasks:
+            task.cancel()
+
+
+def build_targeting_response(
+    product_input: ProductInput,
+    personas: List[TastePersona],
+    campaign_copies: List[CampaignCopy],
+    suggestions: Dict[str, List[str]],
+) -> TasteTargetResponse:
+    """Assemble the final response for a finished targeting pipeline"""
+    return TasteTargetResponse(
+        product_name=product_input.product_name,
+        personas=personas,
+        campaign_copies=campaign_copies,
+        generation_timestamp=datetime.utcnow().isoformat(),
+        suggestions=suggestions,
+        data_source=(
+            "Qloo Taste AI + OpenAI GPT-4"
+            if settings.QLOO_API_KEY
+            else "OpenAI GPT-4 (Mock Qloo)"
+        ),
+    )
+
+
+async def stream_targeting_events(
+    product_input: ProductInput,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Run the targeting pipeline and yield (event, payload) pairs as each
+    stage produces results: clusters, persona, copy, suggestions, done"""
+    cached = await get_cached_response(product_input)
+    if cached:
+        yield "clusters", [
+            {"cluster_id": persona.persona_id, "interests": persona.cultural_interests}
+            for persona in cached.personas
+        ]
+        for persona in cached.personas:
+            yield "persona", persona.dict()
+        for copy in cached.campaign_copies:
+            yield "copy", copy.dict()
+        yield "suggestions", cached.suggestions
+        yield "done", cached.dict()
+        return
+
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    fallbacks = start_fallback_tracking()
+
+    with span("qloo"):
+        taste_clusters = await call_qloo_api(product_input.dict())
+    yield "clusters", taste_clusters
+
+    async def on_persona(persona: TastePersona):
+        await queue.put(("persona", persona.dict()))
+
+    async def on_copy(copy: CampaignCopy):
+        await queue.put(("copy", copy.dict()))
+
+    async def run_pipeline():
+        try:
+            return await generate_personas_and_copies(
+                product_input, taste_clusters, on_persona=on_persona, on_copy=on_copy
+            )
+        finally:
+            await queue.put(finished)
+
+    task = asyncio.create_task(run_pipeline())
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            yield item
+
+        personas, campaign_copies = await task
+        with span("suggestions"):
+            suggestions = await generate_suggestions(product_input, personas)
+        yield "suggestions", suggestions
+
+        response = build_targeting_response(
+            product_input, personas, campaign_copies, suggestions
+        )
+        await store_if_complete(product_input, response, fallbacks)
+        yield "done", response.dict()
+    finally:
+        # Client went away mid-stream: stop the remaining LLM calls
+        if not task.done():
+            task.cancel()
 
 
 def create_fallback_copy(
     product_input: ProductInput, persona: TastePersona
 ) -> CampaignCopy:
     """Fallback copy when generation fails"""
+    record_fallback("copy")
     return CampaignCopy(
         persona_id=persona.persona_id,
         tagline=f"{product_input.product_name} - Crafted for You",
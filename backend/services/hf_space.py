@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional
+
+import httpx
+from gradio_client import Client
+
+from core.configuration.config import settings
+from utils.metrics import UPSTREAM_LATENCY
+from utils.resilience import CircuitBreaker
+from utils.timing import annotate_span
+
+logger = logging.getLogger(__name__)
+
+
+class HFSpaceUnavailable(Exception):
+    """No healthy Space client could be obtained in time"""
+
+
+class _PooledClient:
+    def __init__(self, client: Client):
+        self.client = client
+        self.uses = 0
+
+
+class HFClientPool:
+    """Bounded pool of long-lived Gradio clients for one Hugging Face Space.
+
+    Creating a ``Client`` performs the Space handshake and config fetch, so
+    clients are created once (warmed at startup), reused across requests and
+    handed out one request at a time. A client is recycled (closed and
+    replaced in the background) when its predict fails or misses the
+    deadline, after ``max_uses`` predictions, or when the periodic health
+    check cannot reach the Space through it. Repeated failures open
+    ``breaker``, which makes ``predict`` fail fast so callers fall back.
+    """
+
+    def __init__(
+        self,
+        space: str,
+        size: int,
+        predict_deadline: float,
+        acquire_timeout: float,
+        max_uses: int,
+        health_check_interval: float,
+        breaker: CircuitBreaker,
+        create_client: Optional[Callable[[str], Client]] = None,
+    ):
+        self.space = space
+        self.size = max(1, size)
+        self.predict_deadline = predict_deadline
+        self.acquire_timeout = acquire_timeout
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+        self.breaker = breaker
+        self.create_client = create_client or (
+            lambda space: Client(space, verbose=False)
+        )
+        self._idle: Deque[_PooledClient] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._live = 0
+        self._background: List[asyncio.Task] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self.created = 0
+        self.recycled = 0
+        self.create_failures = 0
+        self.predictions = 0
+        self.timeouts = 0
+
+    async def start(self, warm: bool = True):
+        """Warm the pool and start health checks (both in the background)"""
+        if warm:
+            for _ in range(self.size):
+                self._spawn(self._add_client())
+        if self.health_check_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        tasks = self._background + ([self._health_task] if self._health_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._background.clear()
+        self._health_task = None
+        while self._idle:
+            await self._discard(self._idle.popleft(), replace=False)
+
+    def _wake(self):
+        """Let acquirers re-check the pool after a client was returned or a
+        slot was freed"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _put_idle(self, pooled: _PooledClient):
+        self._idle.append(pooled)
+        self._wake()
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background.append(task)
+        task.add_done_callback(self._background.remove)
+
+    async def _create(self) -> _PooledClient:
+        """Connect a new client into a slot the caller already reserved by
+        incrementing ``_live`` (before any await, so the pool never grows
+        past ``size``)"""
+        try:
+            client = await asyncio.to_thread(self.create_client, self.space)
+        except Exception as e:
+            self._live -= 1
+            self._wake()
+            self.create_failures += 1
+            self.breaker.record_failure()
+            logger.warning(f"Could not connect to Space {self.space}: {e}")
+            raise HFSpaceUnavailable(str(e)) from e
+        self.created += 1
+        return _PooledClient(client)
+
+    async def _add_client(self):
+        if self._live >= self.size:
+            return
+        self._live += 1
+        try:
+            self._put_idle(await self._create())
+        except HFSpaceUnavailable:
+            pass
+
+    async def _discard(self, pooled: _PooledClient, replace: bool = True):
+        self._live -= 1
+        self.recycled += 1
+        self._wake()
+        close = getattr(pooled.client, "close", None)
+        if close:
+            try:
+                await asyncio.to_thread(close)
+            except Exception as e:
+                logger.debug(f"Error closing Space client: {e}")
+        if replace and self.breaker.state != "open":
+            self._spawn(self._add_client())
+
+    async def _acquire(self) -> _PooledClient:
+        if not self.breaker.allow():
+            raise HFSpaceUnavailable(f"Circuit breaker open for {self.space}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.acquire_timeout
+        while True:
+            if self._idle:
+                return self._idle.popleft()
+            if self._live < self.size:
+                return await self._create_within(deadline - loop.time())
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                break
+        raise HFSpaceUnavailable(f"No Space client free within {self.acquire_timeout}s")
+
+    async def _create_within(self, timeout: float) -> _PooledClient:
+        """Create a client for this caller; a handshake slower than the
+        acquire timeout is left to finish and then joins the idle pool"""
+        self._live += 1
+        creating = asyncio.create_task(self._create())
+        try:
+            return await asyncio.wait_for(asyncio.shield(creating), max(0, timeout))
+        except asyncio.TimeoutError:
+            creating.add_done_callback(self._adopt)
+            raise HFSpaceUnavailable(
+                f"Space handshake slower than {self.acquire_timeout}s"
+            ) from None
+
+    def _adopt(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is None:
+            self._put_idle(task.result())
+
+    async def predict(self, *args: Any, api_name: str = "/predict") -> Any:
+        pooled = await self._acquire()
+        start = time.perf_counter()
+        healthy = False
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(pooled.client.predict, *args, api_name=api_name),
+                self.predict_deadline,
+            )
+            healthy = True
+            self.breaker.record_success()
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise HFSpaceUnavailable(
+                f"Space predict missed the {self.predict_deadline}s deadline"
+            ) from None
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.predictions += 1
+            pooled.uses += 1
+            UPSTREAM_LATENCY.observe(
+                time.perf_counter() - start,
+                upstream="hf_space",
+                outcome="success" if healthy else "error",
+            )
+            annotate_span(upstream="hf_space", pooled_client_uses=pooled.uses)
+            # A timed-out predict may still be running in its thread, so the
+            # client is never handed out again after a failure
+            if healthy and pooled.uses < self.max_uses:
+                self._put_idle(pooled)
+            else:
+                self._spawn(self._discard(pooled))
+
+    def _probe(self, client: Client) -> bool:
+        src = getattr(client, "src", None)
+        if not src:
+            return True
+        response = httpx.get(
+            f"{src.rstrip('/')}/config",
+            headers=getattr(client, "headers", None),
+            timeout=10,
+        )
+        return response.status_code == 200
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Space client health check failed: {e}")
+
+    async def check_health(self):
+        """Probe idle clients, recycle broken ones and top the pool back up.
+
+        Clients are taken out one at a time, so the rest of the pool stays
+        available to requests while a probe is running.
+        """
+        for pooled in list(self._idle):
+            # Skip clients handed out since the check started
+            if pooled not in self._idle:
+                continue
+            self._idle.remove(pooled)
+            try:
+                healthy = await asyncio.to_thread(self._probe, pooled.client)
+            except Exception:
+                healthy = False
+            if healthy:
+                self._put_idle(pooled)
+            else:
+                logger.warning(f"Recycling unhealthy Space client for {self.space}")
+                await self._discard(pooled, replace=False)
+        if self.breaker.state != "open":
+            for _ in range(self.size - self._live):
+                await self._add_client()
+
+    def snapshot(self) -> dict:
+        return {
+            "space": self.space,
+            "size": self.size,
+            "live": self._live,
+            "idle": len(self._idle),
+            "created": self.created,
+            "recycled": self.recycled,
+            "create_failures": self.create_failures,
+            "predictions": self.predictions,
+            "timeouts": self.timeouts,
+            "breaker": self.breaker.state,
+        }
+
+
+hf_breaker = CircuitBreaker(
+    "hf_space",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+)
+
+hf_pool = HFClientPool(
+    settings.HF_SPACE_ID,
+    size=settings.HF_POOL_SIZE,
+    predict_deadline=settings.HF_PREDICT_DEADLINE,
+    acquire_timeout=settings.HF_POOL_ACQUIRE_TIMEOUT,
+    max_uses=settings.HF_CLIENT_MAX_USES,
+    health_check_interval=settings.HF_HEALTH_CHECK_INTERVAL,
+    breaker=hf_breaker,
+)
+
+
+def get_hf_pool_stats() -> dict:
+    return hf_pool.snapshot()
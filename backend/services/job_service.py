@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.configuration.config import settings
+from models.schemas import JobStatusResponse, ProductInput
+from services.generator import stream_targeting_events
+
+logger = logging.getLogger(__name__)
+
+
+class JobCapacityError(Exception):
+    """Raised when too many jobs are already running"""
+
+
+class Job:
+    def __init__(self, product_input: ProductInput):
+        self.job_id = uuid.uuid4().hex
+        self.product_input = product_input
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {
+            "qloo": "pending",
+            "personas": 0,
+            "copies": 0,
+            "total_personas": None,
+            "suggestions": "pending",
+        }
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow().isoformat()
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def touch(self):
+        self.updated_at = datetime.utcnow().isoformat()
+
+    def to_response(self) -> JobStatusResponse:
+        return JobStatusResponse(
+            job_id=self.job_id,
+            status=self.status,
+            progress=self.progress,
+            result=self.result,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+
+class JobStore:
+    """In-process registry of background targeting jobs.
+
+    Running jobs are capped at ``max_active``; finished jobs are kept for
+    ``ttl`` seconds (and at most ``max_stored`` of them) so their results can
+    be fetched repeatedly without rerunning the pipeline.
+    """
+
+    def __init__(self, max_active: int, max_stored: int, ttl: float):
+        self.max_active = max_active
+        self.max_stored = max_stored
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    @property
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def create(self, product_input: ProductInput) -> Job:
+        self._purge()
+        if self.active_count >= self.max_active:
+            raise JobCapacityError(f"{self.max_active} jobs already running")
+
+        job = Job(product_input)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Queued job {job.job_id} for: {product_input.product_name}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.touch()
+        try:
+            async for event, data in stream_targeting_events(job.product_input):
+                if event == "clusters":
+                    job.progress["qloo"] = "done"
+                    job.progress["total_personas"] = len(data)
+                elif event == "persona":
+                    job.progress["personas"] += 1
+                elif event == "copy":
+                    job.progress["copies"] += 1
+                elif event == "suggestions":
+                    job.progress["suggestions"] = "done"
+                elif event == "done":
+                    job.result = data
+                job.touch()
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Job cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.monotonic()
+            job.touch()
+
+    def _purge(self):
+        now = time.monotonic()
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl
+        ]:
+            del self._jobs[job_id]
+
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_stored)]:
+            del self._jobs[job_id]
+
+    async def shutdown(self):
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_store = JobStore(
+    max_active=settings.JOBS_MAX_ACTIVE,
+    max_stored=settings.JOBS_MAX_STORED,
+    ttl=settings.JOBS_TTL,
+)
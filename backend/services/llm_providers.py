@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProviderError(Exception):
+    """Upstream LLM failure carrying the HTTP status (and response headers,
+    for Retry-After and rate-limit state) the provider reported"""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 500,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class Completion:
+    """Completion text plus the token usage and response headers the
+    provider reported"""
+
+    def __init__(
+        self,
+        text: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.headers = headers or {}
+
+
+class LLMProvider(ABC):
+    """Interface behind call_openai_api: turn a prompt into a Completion"""
+
+    name = "base"
+    # System message sent with every prompt (part of the LLM cache key)
+    system_prompt = ""
+
+    @abstractmethod
+    async def complete(
+        self,
+        prompt: str,
+        temperature: float,
+        model: str,
+        max_tokens: int,
+        json_mode: bool = False,
+    ) -> Completion:
+        """Complete ``prompt``; raise LLMProviderError on upstream failure"""
+
+    async def close(self):
+        pass
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline stand-in for the OpenAI API.
+
+    Returns schema-valid persona, batched persona and campaign copy JSON
+    without network access. Output and latency are derived from the seed and
+    the prompt, so a given prompt gets the same text on every call. Injected
+    errors and truncation are drawn per call from a sequence seeded once per
+    provider, so a retry of a failed prompt can succeed while a run with the
+    same seed and call order still fails the same calls.
+
+    Latency distributions: ``fixed`` (always ``latency_ms``), ``uniform``
+    (``latency_ms`` +/- ``spread``) and ``lognormal`` (median ``latency_ms``,
+    sigma ``spread``) for realistic long tails.
+
+    ``truncate_rate`` cuts that share of responses short, the way a
+    completion that hits ``max_tokens`` does, to exercise JSON repair.
+    """
+
+    name = "local"
+
+    NAMES = ["Conscious", "Urban", "Digital", "Luxury", "Modern", "Creative", "Mindful"]
+    ROLES = ["Pioneer", "Explorer", "Connoisseur", "Optimizer", "Curator", "Maker"]
+    TRAITS = ["curious", "values-driven", "trendsetting", "pragmatic", "social",
+              "quality-focused", "authentic", "ambitious"]
+    CHANNELS = ["Instagram", "TikTok", "YouTube", "Newsletter", "LinkedIn",
+                "Podcasts", "Pinterest"]
+    INFLUENCERS = ["Micro-influencers", "Industry experts", "Lifestyle creators",
+                   "Thought leaders", "Community organisers"]
+
+    def __init__(
+        self,
+        latency_ms: float = 300,
+        distribution: str = "lognormal",
+        spread: float = 0.5,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        truncate_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.spread = spread
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.truncate_rate = truncate_rate
+        self.seed = seed
+        self._faults = random.Random(seed)
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latency in seconds for one call"""
+        if self.distribution == "fixed":
+            latency = self.latency_ms
+        elif self.distribution == "uniform":
+            latency = rng.uniform(
+                self.latency_ms * (1 - self.spread), self.latency_ms * (1 + self.spread)
+            )
+        else:
+            latency = rng.lognormvariate(0, self.spread) * self.latency_ms
+        return max(0.0, latency) / 1000
+
+    async def complete(
+        self,
+        prompt: str,
+        temperature: float,
+        model: str,
+        max_tokens: int,
+        json_mode: bool = False,
+    ) -> Completion:
+        rng = self._rng(prompt)
+        # Drawn before the first await so the sequence follows call order
+        fail = self._faults.random() < self.error_rate
+        truncate_at = None
+        if self._faults.random() < self.truncate_rate:
+            truncate_at = self._faults.random()
+        await asyncio.sleep(self.sample_latency(rng))
+
+        if fail:
+            raise LLMProviderError(
+                f"Local provider injected failure ({self.error_status})",
+                status_code=self.error_status,
+                headers={"retry-after": "1"} if self.error_status == 429 else None,
+            )
+
+        text = self._generate(rng, prompt)
+        if truncate_at is not None:
+            # Cut somewhere between a quarter of the text and its last char
+            shortest = len(text) // 4
+            text = text[: shortest + int(truncate_at * (len(text) - 1 - shortest))]
+        return Completion(text, count_tokens(prompt), count_tokens(text))
+
+    def _generate(self, rng: random.Random, prompt: str) -> str:
+        cluster_ids = re.findall(r"cluster_id: (\S+)", prompt)
+        if cluster_ids:
+            return json.dumps(
+                {
+                    "personas": [
+                        self._persona(rng, cluster_id) for cluster_id in cluster_ids
+                    ]
+                }
+            )
+        if "persona_name" in prompt:
+            return json.dumps(self._persona(rng))
+        if "tagline" in prompt:
+            return json.dumps(self._copy(rng, prompt))
+        return json.dumps({"text": "Local provider response"})
+
+    def _persona(self, rng: random.Random, cluster_id: Optional[str] = None) -> dict:
+        persona = {
+            "persona_name": f"The {rng.choice(self.NAMES)} {rng.choice(self.ROLES)}",
+            "description": "A deterministic persona produced by the local provider. "
+            "They care about quality and how products fit their values.",
+            "psychographics": rng.sample(self.TRAITS, 5),
+            "preferred_channels": rng.sample(self.CHANNELS, 4),
+            "influencer_types": rng.sample(self.INFLUENCERS, 3),
+        }
+        if cluster_id:
+            persona = {"cluster_id": cluster_id, **persona}
+        return persona
+
+    def _copy(self, rng: random.Random, prompt: str) -> dict:
+        match = re.search(r"Create marketing copy for (.+?) targeting", prompt)
+        product = match.group(1) if match else "our product"
+        return {
+            "tagline": f"{product}, made for you",
+            "social_caption": f"Meet {product} ✨ Built around what you love. 🌟",
+            "ad_copy": f"Discover {product}. Designed with care. Made to last. "
+            "Ready when you are.",
+            "email_subject": f"Your {product[:30]} is here",
+            "product_description": f"{product} fits the way you live. "
+            f"Every detail is {rng.choice(self.TRAITS)} by design.",
+        }
@@ -1,34 +1,466 @@
-import asyncio
-import json
-from openai import OpenAI
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
 from fastapi import HTTPException
 from core.configuration.config import settings
+from typing import Any, Callable, Optional, Tuple
+from services.llm_providers import (
+    Completion,
+    LLMProvider,
+    LLMProviderError,
+    LocalProvider,
+)
+from utils.cache import SQLiteCache, hash_key
+from utils.json_stream import CLEAN, parse_json
+from utils.metrics import (
+    LLM_RATE_LIMIT_WAIT,
+    LLM_SLOT_WAIT,
+    LLM_TOKENS,
+    STRUCTURED_OUTPUTS,
+    UPSTREAM_LATENCY,
+)
+from utils.rate_limit import RateLimitScheduler, retry_after_seconds
+from utils.resilience import RETRYABLE_STATUS_CODES, CircuitBreaker, retry_async
+from utils.timing import annotate_span
+from utils.tokens import count_tokens
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
 import logging
+import time
 
 logger = logging.getLogger(__name__)
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client: Optional[AsyncOpenAI] = None
+
+
+class PoolStats:
+    """Process-wide LLM call slots and how busy they are.
+
+    At most ``max_concurrency`` provider calls run at once, whether they come
+    from single, stream, job or batch requests; further calls queue for a
+    slot. A slot is held only for the provider call itself, not through
+    rate-limit waits or retry backoff. ``saturated_calls`` counts calls that
+    found every slot taken and had to queue.
+    """
+
+    def __init__(self, max_concurrency: int, max_connections: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_connections = max_connections
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_calls = 0
+        self.waiting = 0
+        self.saturated_calls = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a call slot; yields how long the call queued for it"""
+        if self._slots.locked():
+            self.saturated_calls += 1
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - start
+        self.wait_seconds += waited
+        LLM_SLOT_WAIT.observe(waited)
+
+        self.in_flight += 1
+        self.total_calls += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield waited
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "total_calls": self.total_calls,
+            "waiting": self.waiting,
+            "saturated_calls": self.saturated_calls,
+            "slot_wait_seconds": round(self.wait_seconds, 3),
+            "utilization": round(self.in_flight / self.max_concurrency, 3),
+        }
+
+
+# Shared by every caller so a large batch queues here rather than flooding
+# the provider
+pool_stats = PoolStats(settings.LLM_MAX_CONCURRENCY, settings.OPENAI_MAX_CONNECTIONS)
+llm_cache = (
+    SQLiteCache(
+        settings.LLM_CACHE_PATH,
+        max_bytes=settings.LLM_CACHE_MAX_BYTES,
+        ttl=settings.LLM_CACHE_TTL,
+    )
+    if settings.LLM_CACHE_ENABLED
+    else None
+)
+
+
+def init_openai_client() -> Optional[AsyncOpenAI]:
+    """Create the shared async client with a pooled keep-alive transport"""
+    global client
+    if client is not None:
+        return client
+    if not settings.OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not found, OpenAI calls will fail")
+        return None
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=settings.OPENAI_TIMEOUT,
+    )
+    # Retries are handled by call_openai_api so they can feed the breaker
+    client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY, http_client=http_client, max_retries=0
+    )
+    logger.info(
+        f"OpenAI client ready (pool of {settings.OPENAI_MAX_CONNECTIONS} connections)"
+    )
+    return client
+
+
+async def close_openai_client():
+    """Close the shared client and its connection pool"""
+    global client
+    if client is not None:
+        await client.close()
+        client = None
+        logger.info("OpenAI client closed")
+
+
+# Completion budgets per call type: a persona JSON needs ~200 tokens and a
+# copy JSON ~300, so the old flat 1000 only left room for runaway output
+TOKEN_BUDGETS = {
+    "persona": settings.TOKEN_BUDGET_PERSONA,
+    "copy": settings.TOKEN_BUDGET_COPY,
+}
+
+# Shared RPM/TPM budget: calls queue here instead of being sent into a 429
+llm_scheduler = RateLimitScheduler(
+    "llm",
+    requests_per_minute=settings.LLM_RATE_LIMIT_RPM,
+    tokens_per_minute=settings.LLM_RATE_LIMIT_TPM,
+)
+
+llm_breaker = CircuitBreaker(
+    "llm",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+)
+
+
+def get_openai_pool_stats() -> dict:
+    return pool_stats.snapshot()
+
+
+def get_llm_rate_limit_stats() -> dict:
+    return llm_scheduler.snapshot()
+
+
+def get_llm_cache_stats() -> dict:
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.snapshot()}
+
+
+def make_llm_cache_key(
+    prompt: str,
+    temperature: float,
+    model: str,
+    max_tokens: int,
+    json_mode: bool = False,
+    provider_name: str = "openai",
+    system_prompt: str = "",
+) -> str:
+    """Key for a completion; the provider is part of it so synthetic local
+    output is never served as a real completion"""
+    return hash_key(
+        {
+            "provider": provider_name,
+            "system": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            "model": model,
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "json_mode": json_mode,
+        }
+    )
+
+
+async def call_openai_api(
+    prompt: str,
+    temperature: float = 0.7,
+    model: str = "gpt-4o-mini",
+    max_tokens: Optional[int] = None,
+    cache_if: Optional[Callable[[str], bool]] = None,
+    call_type: str = "default",
+    json_mode: bool = False,
+    bypass_cache: bool = False,
+) -> str:
+    """Call the chat completions API.
+
+    ``json_mode`` asks the provider for structured output (a single JSON
+    object), so the prompt must ask for an object rather than an array.
+
+    ``max_tokens`` defaults to the budget for ``call_type`` (see
+    TOKEN_BUDGETS); prompt and completion token usage is recorded per
+    call type on the current span and in /metrics.
+
+    Passing ``cache_if`` opts the call into the persistent LLM cache, which
+    only applies to deterministic calls: ``temperature`` at or below
+    LLM_CACHE_MAX_TEMPERATURE (0 by default, so sampled persona and copy
+    calls are not reused unless that is raised). A cached response is reused
+    when present (unless ``bypass_cache``), and a fresh response is only
+    stored when ``cache_if(response)`` is true, so output that the caller
+    would reject (and replace with a fallback) is never cached.
+    """
+    if max_tokens is None:
+        max_tokens = TOKEN_BUDGETS.get(call_type, settings.TOKEN_BUDGET_DEFAULT)
+
+    cache_key = None
+    if (
+        cache_if is not None
+        and llm_cache is not None
+        and temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+    ):
+        cache_key = make_llm_cache_key(
+            prompt,
+            temperature,
+            model,
+            max_tokens,
+            json_mode,
+            provider_name=provider.name,
+            system_prompt=provider.system_prompt,
+        )
+        cached = (
+            None if bypass_cache else await asyncio.to_thread(llm_cache.get, cache_key)
+        )
+        if cached is not None:
+            annotate_span(llm_cache="hit")
+            return cached
+
+    response_text = await _complete(
+        prompt, temperature, model, max_tokens, call_type, json_mode
+    )
 
-async def call_openai_api(prompt: str, temperature: float = 0.7, model: str = "gpt-4o-mini") -> str:
+    if cache_key is not None and cache_if(response_text):
+        await asyncio.to_thread(llm_cache.set, cache_key, response_text)
+    return response_text
+
+
+class OpenAIProvider(LLMProvider):
+    """Chat completions over the shared pooled AsyncOpenAI client"""
+
+    name = "openai"
+    system_prompt = "You are a marketing expert..."
+
+    async def complete(
+        self,
+        prompt: str,
+        temperature: float,
+        model: str,
+        max_tokens: int,
+        json_mode: bool = False,
+    ) -> Completion:
+        openai_client = client or init_openai_client()
+        if openai_client is None:
+            raise LLMProviderError("OpenAI client not configured", status_code=401)
+
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        try:
+            # Raw response so the rate-limit headers reach the scheduler
+            raw = await openai_client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra,
+            )
+        except APIStatusError as e:
+            raise LLMProviderError(
+                str(e), status_code=e.status_code, headers=dict(e.response.headers)
+            ) from e
+        except APITimeoutError as e:
+            raise LLMProviderError(str(e), status_code=504) from e
+        except APIConnectionError as e:
+            raise LLMProviderError(str(e), status_code=503) from e
+        response = raw.parse()
+        usage = response.usage
+        return Completion(
+            response.choices[0].message.content,
+            prompt_tokens=usage.prompt_tokens if usage else count_tokens(prompt),
+            completion_tokens=usage.completion_tokens if usage else 0,
+            headers=dict(raw.headers),
+        )
+
+    async def close(self):
+        await close_openai_client()
+
+
+def create_llm_provider() -> LLMProvider:
+    if settings.LLM_PROVIDER == "local":
+        logger.info("Using the local deterministic LLM provider")
+        return LocalProvider(
+            latency_ms=settings.LOCAL_LLM_LATENCY_MS,
+            distribution=settings.LOCAL_LLM_LATENCY_DISTRIBUTION,
+            spread=settings.LOCAL_LLM_LATENCY_SPREAD,
+            error_rate=settings.LOCAL_LLM_ERROR_RATE,
+            error_status=settings.LOCAL_LLM_ERROR_STATUS,
+            truncate_rate=settings.LOCAL_LLM_TRUNCATE_RATE,
+            seed=settings.LOCAL_LLM_SEED,
+        )
+    return OpenAIProvider()
+
+
+provider: LLMProvider = create_llm_provider()
+
+
+def set_llm_provider(new_provider: LLMProvider) -> LLMProvider:
+    """Swap the active provider (benchmarks, tests); returns the previous one"""
+    global provider
+    previous, provider = provider, new_provider
+    return previous
+
+
+def is_retryable_llm_error(error: Exception) -> bool:
+    if isinstance(error, LLMProviderError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+async def _complete(
+    prompt: str,
+    temperature: float,
+    model: str,
+    max_tokens: int,
+    call_type: str,
+    json_mode: bool,
+) -> str:
+    if not llm_breaker.allow():
+        annotate_span(upstream="llm", circuit="open")
+        raise HTTPException(status_code=503, detail="LLM circuit breaker open")
+
+    estimated_tokens = count_tokens(prompt) + max_tokens
+    rate_limit_wait = 0.0
+    slot_wait = 0.0
+
+    async def attempt() -> Completion:
+        nonlocal rate_limit_wait, slot_wait
+        waited = await llm_scheduler.acquire(estimated_tokens)
+        rate_limit_wait += waited
+        LLM_RATE_LIMIT_WAIT.observe(waited)
+        try:
+            async with pool_stats.slot() as queued:
+                slot_wait += queued
+                completion = await provider.complete(
+                    prompt, temperature, model, max_tokens, json_mode=json_mode
+                )
+        except LLMProviderError as e:
+            llm_scheduler.reconcile(estimated_tokens, 0)
+            llm_scheduler.observe_headers(e.headers)
+            if e.status_code == 429:
+                llm_scheduler.pause(
+                    retry_after_seconds(e.headers) or settings.LLM_RATE_LIMIT_PAUSE
+                )
+            raise
+        llm_scheduler.observe_headers(completion.headers)
+        llm_scheduler.reconcile(
+            estimated_tokens, completion.prompt_tokens + completion.completion_tokens
+        )
+        return completion
+
+    start = time.perf_counter()
+    outcome = "error"
     try:
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a marketing expert..."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
+        completion = await retry_async(
+            attempt,
+            is_retryable_llm_error,
+            max_retries=settings.LLM_MAX_RETRIES,
+            base_delay=settings.RETRY_BASE_DELAY,
+            max_delay=settings.RETRY_MAX_DELAY,
+            description=f"{provider.name} LLM call",
+            breaker=llm_breaker,
+        )
+        llm_breaker.record_success()
+        annotate_span(
+            upstream="llm",
+            upstream_status=200,
+            max_tokens=max_tokens,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens,
+            rate_limit_wait_ms=round(rate_limit_wait * 1000, 2),
+            slot_wait_ms=round(slot_wait * 1000, 2),
+        )
+        LLM_TOKENS.inc(completion.prompt_tokens, call_type=call_type, kind="prompt")
+        LLM_TOKENS.inc(
+            completion.completion_tokens, call_type=call_type, kind="completion"
+        )
+        outcome = "success"
+        return completion.text
     except Exception as e:
-        logger.error(f"OpenAI error: {e}")
+        # A 429 means "slow down", which the scheduler handles; it is not a
+        # sign of an unhealthy upstream
+        if is_retryable_llm_error(e) and getattr(e, "status_code", None) != 429:
+            llm_breaker.record_failure()
+        logger.error(f"{provider.name} LLM error: {e}")
+        annotate_span(upstream="llm", upstream_status=getattr(e, "status_code", None))
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        UPSTREAM_LATENCY.observe(
+            time.perf_counter() - start, upstream="openai", outcome=outcome
+        )
+
+
+def parse_structured_response(
+    response: str,
+    call_type: str,
+    openers: str = "{[",
+    max_open: Optional[int] = None,
+) -> Tuple[Any, str]:
+    """Tolerantly parse an LLM JSON response and record how it went.
+
+    Returns the parsed value and the outcome (clean, repaired, salvaged or
+    failed, see utils.json_stream); outcomes are counted per call type in
+    /metrics so repair and salvage rates can be compared with fallbacks.
+    ``openers`` and ``max_open`` are passed to the parser.
+    """
+    data, outcome = parse_json(response, openers, max_open)
+    STRUCTURED_OUTPUTS.inc(call_type=call_type, outcome=outcome)
+    annotate_span(parse=outcome)
+    if outcome != CLEAN:
+        logger.warning(f"{call_type} response parse outcome: {outcome}")
+    return data, outcome
+
+
+def is_clean_json(response: str) -> bool:
+    """True when the response parses without repair (safe to cache)"""
+    return parse_json(response)[1] == CLEAN
+
 
 def extract_json_from_response(response: str) -> dict:
-    try:
-        response = response.strip().lstrip("```json").lstrip("```").rstrip("```")
-        return json.loads(response[response.find('{'):response.rfind('}')+1])
-    except Exception as e:
-        logger.warning(f"JSON parse error: {e}")
-        return {}
+    data, _ = parse_json(response, openers="{")
+    return data if isinstance(data, dict) else {}
+
+
+def extract_json_array_from_response(response: str) -> list:
+    """Array from a bare JSON array or an object wrapping one (JSON mode)"""
+    data, _ = parse_json(response)
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [])
+    return data if isinstance(data, list) else []
@@ -3,8 +3,15 @@ import json
 from openai import OpenAI
 from fastapi import HTTPException
 from core.configuration.config import settings
-from typing import List, Dict
+from typing import List, Dict, Optional
+from utils.cache import TTLCache, hash_key
+from utils.fallbacks import record_fallback
+from utils.metrics import FALLBACKS, UPSTREAM_LATENCY
+from utils.resilience import RETRYABLE_STATUS_CODES, CircuitBreaker, retry_async
+from utils.singleflight import SingleFlight
+from utils.timing import annotate_span, span
 import logging
+import time
 import httpx
 
 logger = logging.getLogger(__name__)
@@ -13,88 +20,252 @@ QLOO_API_KEY = settings.QLOO_API_KEY
 QLOO_API_URL = settings.QLOO_API_URL
 
 
-# Qloo API Integration (same as before)
-async def call_qloo_api(product_info: dict) -> List[dict]:
-    """Call Qloo API v2 for taste-based insights"""
-    if not QLOO_API_KEY:
-        logger.warning("QLOO_API_KEY not found, using mock data")
-        return await mock_qloo_api(product_info)
+TAG_MAPPINGS = {
+    "sustainability": [
+        "urn:tag:genre:lifestyle:eco-friendly",
+        "urn:tag:genre:lifestyle:sustainable",
+    ],
+    "innovation": [
+        "urn:tag:genre:tech:innovative",
+        "urn:tag:genre:lifestyle:modern",
+    ],
+    "luxury": [
+        "urn:tag:genre:lifestyle:luxury",
+        "urn:tag:genre:lifestyle:premium",
+    ],
+    "minimalism": [
+        "urn:tag:genre:lifestyle:minimalist",
+        "urn:tag:genre:lifestyle:simple",
+    ],
+    "ethical": [
+        "urn:tag:genre:lifestyle:ethical",
+        "urn:tag:genre:lifestyle:conscious",
+    ],
+    "quality": [
+        "urn:tag:genre:lifestyle:quality",
+        "urn:tag:genre:lifestyle:premium",
+    ],
+}
+
+# Insights responses keyed by the full query, so repeated tag lookups are free
+qloo_cache = TTLCache(
+    max_entries=settings.QLOO_CACHE_MAX_ENTRIES, ttl=settings.QLOO_CACHE_TTL
+)
+
+
+qloo_flights: SingleFlight[Optional[dict]] = SingleFlight("qloo_insights")
+
+
+def get_qloo_cache_stats() -> dict:
+    return qloo_cache.snapshot()
+
+
+qloo_breaker = CircuitBreaker(
+    "qloo",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+)
+
+
+class QlooStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"Qloo API returned {status_code}")
+        self.status_code = status_code
+
+
+def is_retryable_qloo_error(error: Exception) -> bool:
+    return isinstance(error, (QlooStatusError, httpx.TransportError))
+
+
+def build_insights_params(value: str) -> Dict[str, str]:
+    """Query parameters for the /v2/insights lookup of one brand value"""
+    tags = TAG_MAPPINGS.get(value, [f"urn:tag:genre:lifestyle:{value}"])
+    return {
+        "filter.type": "urn:demographics",
+        "signal.interests.tags": (
+            tags[0] if tags else f"urn:tag:genre:lifestyle:{value}"
+        ),
+    }
 
-    headers = {"X-Api-Key": QLOO_API_KEY, "Content-Type": "application/json"}
 
-    clusters = []
+async def fetch_qloo_insights(
+    client: httpx.AsyncClient, headers: dict, params: Dict[str, str]
+) -> Optional[dict]:
+    """GET /v2/insights for one query, served from the cache when possible.
+
+    Returns the insights JSON, or None on a non-200 response.
+    """
+    cache_key = hash_key(params)
+    insights = qloo_cache.get(cache_key)
+    if insights is not None:
+        logger.info(f"Qloo cache hit: {params}")
+        annotate_span(qloo_cache="hit")
+        return insights
+
+    # Identical lookups already in flight (e.g. products in one batch that
+    # share a brand value) wait for the same request
+    return await qloo_flights.do(
+        cache_key, lambda: _request_insights(client, headers, params, cache_key)
+    )
+
+
+async def _request_insights(
+    client: httpx.AsyncClient, headers: dict, params: Dict[str, str], cache_key: str
+) -> Optional[dict]:
+    base_url = f"{QLOO_API_URL}/v2/insights"
+    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
+    url = f"{base_url}?{query_string}"
+
+    async def attempt() -> httpx.Response:
+        logger.info(f"Calling Qloo API: {url}")
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers)
+        except Exception:
+            UPSTREAM_LATENCY.observe(
+                time.perf_counter() - start, upstream="qloo", outcome="error"
+            )
+            raise
+        UPSTREAM_LATENCY.observe(
+            time.perf_counter() - start,
+            upstream="qloo",
+            outcome="success" if response.status_code == 200 else "error",
+        )
+        annotate_span(upstream="qloo", upstream_status=response.status_code)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise QlooStatusError(response.status_code)
+        return response
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            tag_mappings = {
-                "sustainability": [
-                    "urn:tag:genre:lifestyle:eco-friendly",
-                    "urn:tag:genre:lifestyle:sustainable",
-                ],
-                "innovation": [
-                    "urn:tag:genre:tech:innovative",
-                    "urn:tag:genre:lifestyle:modern",
-                ],
-                "luxury": [
-                    "urn:tag:genre:lifestyle:luxury",
-                    "urn:tag:genre:lifestyle:premium",
-                ],
-                "minimalism": [
-                    "urn:tag:genre:lifestyle:minimalist",
-                    "urn:tag:genre:lifestyle:simple",
-                ],
-                "ethical": [
-                    "urn:tag:genre:lifestyle:ethical",
-                    "urn:tag:genre:lifestyle:conscious",
-                ],
-                "quality": [
-                    "urn:tag:genre:lifestyle:quality",
-                    "urn:tag:genre:lifestyle:premium",
-                ],
-            }
+        response = await retry_async(
+            attempt,
+            is_retryable_qloo_error,
+            max_retries=settings.QLOO_MAX_RETRIES,
+            base_delay=settings.RETRY_BASE_DELAY,
+            max_delay=settings.RETRY_MAX_DELAY,
+            description="Qloo request",
+            breaker=qloo_breaker,
+        )
+    except QlooStatusError as e:
+        qloo_breaker.record_failure()
+        logger.warning(f"Qloo API returned {e.status_code} for {params}")
+        return None
+    except Exception:
+        qloo_breaker.record_failure()
+        raise
+
+    if response.status_code != 200:
+        logger.warning(f"Qloo API returned {response.status_code} for {params}")
+        return None
+
+    qloo_breaker.record_success()
+    insights = response.json()
+    qloo_cache.set(cache_key, insights)
+    return insights
+
+
+# Application-wide pooled client, created in the app lifespan
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def init_qloo_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=settings.QLOO_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.QLOO_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.QLOO_MAX_CONNECTIONS,
+            ),
+        )
+    return http_client
+
+
+async def close_qloo_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+async def query_brand_value(
+    client: httpx.AsyncClient, headers: dict, value: str, index: int
+) -> Optional[dict]:
+    """Fetch and convert insights for one brand value; None when unusable"""
+    with span("qloo_lookup", label=value):
+        try:
+            params = build_insights_params(value)
+            insights = await fetch_qloo_insights(client, headers, params)
+
+            if insights is not None:
+                logger.info(f"Qloo insights received for {value}")
+                return convert_qloo_insights_to_cluster(insights, value, index)
+
+        except Exception as e:
+            logger.error(f"Error querying Qloo for {value}: {e}")
+        return None
 
-            # Query Qloo for insights based on brand values
-            for i, value in enumerate(product_info.get("brand_values", [])[:3]):
-                try:
-                    tags = tag_mappings.get(value, [f"urn:tag:genre:lifestyle:{value}"])
 
-                    base_url = f"{QLOO_API_URL}/v2/insights"
-                    params = {
-                        "filter.type": "urn:demographics",
-                        "signal.interests.tags": (
-                            tags[0] if tags else f"urn:tag:genre:lifestyle:{value}"
-                        ),
-                    }
+# Qloo API Integration (same as before)
+async def call_qloo_api(product_info: dict) -> List[dict]:
+    """Call Qloo API v2 for taste-based insights.
 
-                    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-                    url = f"{base_url}?{query_string}"
+    Brand values are queried concurrently under one deadline for the whole
+    stage; values still pending at the deadline are dropped and the ones that
+    succeeded are kept, in brand-value order.
+    """
+    if not QLOO_API_KEY:
+        # Mock data is the configured source here, not a degraded result
+        logger.warning("QLOO_API_KEY not found, using mock data")
+        annotate_span(fallback=True)
+        FALLBACKS.inc(kind="mock_qloo")
+        return await mock_qloo_api(product_info)
 
-                    logger.info(f"Calling Qloo API: {url}")
-                    response = await client.get(url, headers=headers)
+    if not qloo_breaker.allow():
+        logger.warning("Qloo circuit breaker open, using mock data")
+        annotate_span(fallback=True, circuit="open")
+        record_fallback("mock_qloo")
+        return await mock_qloo_api(product_info)
 
-                    if response.status_code == 200:
-                        insights = response.json()
-                        logger.info(f"Qloo insights received for {value}")
+    headers = {"X-Api-Key": QLOO_API_KEY, "Content-Type": "application/json"}
 
-                        cluster = convert_qloo_insights_to_cluster(insights, value, i)
-                        if cluster:
-                            clusters.append(cluster)
-                    else:
-                        logger.warning(
-                            f"Qloo API returned {response.status_code} for {value}"
-                        )
+    clusters = []
 
-                except Exception as e:
-                    logger.error(f"Error querying Qloo for {value}: {e}")
+    try:
+        client = http_client or init_qloo_client()
+        values = product_info.get("brand_values", [])[:3]
+        tasks = [
+            asyncio.create_task(query_brand_value(client, headers, value, i))
+            for i, value in enumerate(values)
+        ]
+
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks, timeout=settings.QLOO_STAGE_DEADLINE
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(
+                    f"Qloo deadline hit, dropped {len(pending)} of {len(tasks)} lookups"
+                )
+                record_fallback("qloo_partial")
+
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.result():
+                    clusters.append(task.result())
 
     except Exception as e:
         logger.error(f"Qloo API error: {str(e)}")
 
     if clusters:
         logger.info(f"Successfully retrieved {len(clusters)} clusters from Qloo")
+        annotate_span(fallback=False)
         return clusters
     else:
         logger.warning("No usable data from Qloo API, using mock data")
+        annotate_span(fallback=True)
+        record_fallback("mock_qloo")
         return await mock_qloo_api(product_info)
 
 
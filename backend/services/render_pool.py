@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from core.configuration.config import settings
+from services.visual_renderer import warm_renderer
+from utils.metrics import RENDER_DURATION, RENDER_QUEUE_WAIT
+from utils.timing import annotate_span
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPoolFull(Exception):
+    """The render queue is at its limit; the caller should retry later"""
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    # Wall-clock timestamps, so they compare across worker processes
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class RenderPool:
+    """Bounded executor for CPU-bound image work (render, encode, base64).
+
+    Jobs run on ``workers`` threads, or processes when ``kind`` is
+    "process" (each worker warms its own font and template caches). At most
+    ``max_queue`` jobs wait behind the running ones; past that ``run``
+    raises ``RenderPoolFull`` instead of queueing, so a burst of visual
+    requests cannot pile up unbounded work. Jobs must be module-level
+    functions with picklable arguments to work in both modes.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=warm_renderer
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="render"
+            )
+        logger.info(f"Render pool started: {self.workers} {self.kind} workers")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def running(self) -> int:
+        return min(self._pending, self.workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise RenderPoolFull(
+                f"{self._pending} render jobs pending "
+                f"({self.workers} workers, queue limit {self.max_queue})"
+            )
+        self.start()
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        submitted = time.time()
+        try:
+            result, started, finished = await loop.run_in_executor(
+                self._executor, _timed, fn, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        self.completed += 1
+        self.busy_seconds += finished - started
+        queue_wait = max(0.0, started - submitted)
+        RENDER_QUEUE_WAIT.observe(queue_wait)
+        RENDER_DURATION.observe(finished - started)
+        annotate_span(
+            render_queue_ms=round(queue_wait * 1000, 1),
+            render_ms=round((finished - started) * 1000, 1),
+        )
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "utilization": round(self.running / self.workers, 3),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+render_pool = RenderPool(
+    settings.RENDER_POOL_KIND,
+    workers=settings.RENDER_WORKERS,
+    max_queue=settings.RENDER_MAX_QUEUE,
+)
+
+
+def get_render_pool_stats() -> dict:
+    return render_pool.snapshot()
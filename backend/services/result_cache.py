@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import re
+from typing import Any, Callable, List, Optional
+
+from core.configuration.config import settings
+from models.schemas import ProductInput, TasteTargetResponse
+from utils.cache import DiskCache, TTLCache, hash_key
+
+logger = logging.getLogger(__name__)
+
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _normalize_values(values: List[str]) -> List[str]:
+    return sorted({_collapse(value).lower() for value in values if _collapse(value)})
+
+
+def normalize_product_input(product_input: ProductInput) -> dict:
+    """Canonical form of a request: whitespace collapsed, value lists
+    lowercased, deduplicated and sorted. Cache-control flags are excluded."""
+    return {
+        "product_name": _collapse(product_input.product_name),
+        "product_description": _collapse(product_input.product_description),
+        "brand_values": _normalize_values(product_input.brand_values),
+        "target_mood": _normalize_values(product_input.target_mood),
+        "campaign_tone": _collapse(product_input.campaign_tone).lower(),
+        "persona_mode": product_input.persona_mode or settings.PERSONA_MODE,
+    }
+
+
+def make_result_cache_key(product_input: ProductInput) -> str:
+    return hash_key(normalize_product_input(product_input))
+
+
+def _create_cache():
+    backend = settings.RESULT_CACHE_BACKEND.lower()
+    if backend == "off":
+        return None
+    if backend == "disk":
+        return DiskCache(
+            settings.RESULT_CACHE_DIR,
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            ttl=settings.RESULT_CACHE_TTL,
+        )
+    return TTLCache(
+        max_entries=settings.RESULT_CACHE_MAX_ENTRIES, ttl=settings.RESULT_CACHE_TTL
+    )
+
+
+result_cache = _create_cache()
+
+
+async def _call(method: Callable[..., Any], *args: Any) -> Any:
+    """Run a cache method; the disk backend's file I/O goes to a worker
+    thread (like the SQLite LLM cache) so it never blocks the event loop"""
+    if isinstance(result_cache, DiskCache):
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+async def get_cached_response(
+    product_input: ProductInput,
+) -> Optional[TasteTargetResponse]:
+    if result_cache is None or product_input.bypass_cache:
+        return None
+
+    data = await _call(result_cache.get, make_result_cache_key(product_input))
+    if data is None:
+        return None
+
+    logger.info(f"Serving cached targeting for: {product_input.product_name}")
+    return TasteTargetResponse(**{**data, "cached": True})
+
+
+async def store_response(product_input: ProductInput, response: TasteTargetResponse):
+    if result_cache is None:
+        return
+    await _call(
+        result_cache.set, make_result_cache_key(product_input), response.dict()
+    )
+
+
+def get_result_cache_stats() -> dict:
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.snapshot()}
@@ -0,0 +1,407 @@
+"""Local procedural renderer used when the Hugging Face Space is unavailable.
+
+Everything that does not depend on the request text (background, shapes,
+gradients, grids, the watermark) is rendered once per (style, image_type,
+size) into a base-layer template. Each request copies the template and only
+draws its text layers on top.
+"""
+
+import base64
+import io
+import logging
+import math
+import random
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image, ImageDraw, features
+
+from models.schemas import VisualGenerationRequest
+from utils.fonts import fonts
+
+logger = logging.getLogger(__name__)
+
+CANVAS_SIZE = (512, 512)
+
+SANS = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+SANS_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+SERIF_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf"
+
+# Style-specific colors and designs
+STYLE_CONFIGS = {
+    "minimalist clean": {
+        "bg_color": (250, 250, 250),
+        "accent_color": (0, 0, 0),
+        "text_color": (0, 0, 0),
+        "font_size": 24,
+    },
+    "bold vibrant": {
+        "bg_color": (255, 0, 128),
+        "accent_color": (0, 255, 255),
+        "text_color": (255, 255, 255),
+        "font_size": 32,
+    },
+    "luxury premium": {
+        "bg_color": (20, 20, 20),
+        "accent_color": (218, 165, 32),
+        "text_color": (218, 165, 32),
+        "font_size": 28,
+    },
+    "natural organic": {
+        "bg_color": (245, 245, 220),
+        "accent_color": (34, 139, 34),
+        "text_color": (34, 139, 34),
+        "font_size": 26,
+    },
+    "tech futuristic": {
+        "bg_color": (10, 10, 50),
+        "accent_color": (0, 255, 255),
+        "text_color": (0, 255, 255),
+        "font_size": 30,
+    },
+    "artistic creative": {
+        "bg_color": (255, 245, 238),
+        "accent_color": (255, 69, 0),
+        "text_color": (139, 69, 19),
+        "font_size": 28,
+    },
+}
+DEFAULT_STYLE = "minimalist clean"
+
+# Initials font per logo style (anything else uses the artistic one)
+LOGO_FONTS = {
+    "minimalist clean": (SANS_BOLD, 48),
+    "bold vibrant": (SANS_BOLD, 60),
+    "luxury premium": (SERIF_BOLD, 42),
+    "natural organic": (SANS, 36),
+    "tech futuristic": (SANS_BOLD, 48),
+    "artistic creative": (SANS_BOLD, 54),
+}
+BRAND_NAME_FONT = (SANS, 18)
+SMALL_FONT = (SANS, 16)
+
+
+def common_fonts() -> List[Tuple[str, int]]:
+    """Every (font, size) the renderer uses, for warming the font cache"""
+    used = set(LOGO_FONTS.values()) | {BRAND_NAME_FONT, SMALL_FONT}
+    used |= {(SANS_BOLD, config["font_size"]) for config in STYLE_CONFIGS.values()}
+    return sorted(used)
+
+
+def style_config(style: str) -> dict:
+    return STYLE_CONFIGS.get(style, STYLE_CONFIGS[DEFAULT_STYLE])
+
+
+def _draw_logo_base(draw: ImageDraw.ImageDraw, style: str, config: dict):
+    if style == "minimalist clean":
+        # Circular logo with initials
+        draw.ellipse([156, 156, 356, 356], outline=config["accent_color"], width=4)
+
+    elif style == "bold vibrant":
+        # Gradient-style square logo
+        for i in range(100):
+            alpha = int(255 * (1 - i / 100))
+            color = (*config["accent_color"], alpha)
+            draw.rectangle([156 + i, 156 + i, 356 - i, 356 - i], outline=color, width=2)
+
+    elif style == "luxury premium":
+        # Diamond shape with gold accent
+        points = [(256, 106), (406, 256), (256, 406), (106, 256)]
+        draw.polygon(points, outline=config["accent_color"], width=3)
+        # Inner diamond
+        inner_points = [(256, 156), (356, 256), (256, 356), (156, 256)]
+        draw.polygon(inner_points, outline=config["accent_color"], width=2)
+
+    elif style == "natural organic":
+        # Leaf-inspired logo
+        for angle in range(0, 360, 45):
+            x = 256 + 80 * (angle % 90) / 90
+            y = 256 - 80 * (angle % 90) / 90
+            draw.arc(
+                [x - 40, y - 40, x + 40, y + 40],
+                angle,
+                angle + 90,
+                fill=config["accent_color"],
+                width=3,
+            )
+        # Center circle
+        draw.ellipse(
+            [226, 226, 286, 286],
+            fill=config["bg_color"],
+            outline=config["accent_color"],
+            width=3,
+        )
+
+    elif style == "tech futuristic":
+        # Hexagon tech logo
+        for radius, width in ((100, 3), (60, 2)):
+            hex_points = []
+            for i in range(6):
+                angle = i * 60 * math.pi / 180
+                hex_points.append(
+                    (256 + radius * math.cos(angle), 256 + radius * math.sin(angle))
+                )
+            draw.polygon(hex_points, outline=config["accent_color"], width=width)
+
+    # artistic creative: the arcs are seeded by the brand name, so they are
+    # drawn per request
+
+
+def _draw_marketing_base(
+    draw: ImageDraw.ImageDraw, style: str, config: dict, size: Tuple[int, int]
+):
+    width, height = size
+    if style == "minimalist clean":
+        draw.ellipse([156, 156, 356, 356], outline=config["accent_color"], width=3)
+    elif style == "bold vibrant":
+        draw.rectangle([100, 100, 300, 300], fill=config["accent_color"])
+        draw.ellipse([212, 212, 412, 412], fill=config["bg_color"])
+    elif style == "luxury premium":
+        draw.rectangle([106, 206, 406, 306], fill=config["accent_color"])
+    elif style == "natural organic":
+        for i in range(5):
+            x = 256 + i * 30 - 60
+            y = 256 + i * 20 - 40
+            draw.ellipse([x - 50, y - 20, x + 50, y + 20], fill=config["accent_color"])
+    elif style == "tech futuristic":
+        for i in range(0, width, 50):
+            draw.line([(i, 0), (i, height)], fill=config["accent_color"], width=1)
+            draw.line([(0, i), (width, i)], fill=config["accent_color"], width=1)
+    else:
+        draw.arc([100, 100, 400, 400], 0, 270, fill=config["accent_color"], width=5)
+
+    # TasteTarget watermark for marketing visuals only
+    draw.text(
+        (10, height - 20),
+        "TasteTarget AI",
+        fill=config["text_color"],
+        font=fonts.get(*SMALL_FONT),
+    )
+
+
+def render_base_layer(
+    style: str, image_type: str, size: Tuple[int, int] = CANVAS_SIZE
+) -> Image.Image:
+    """Static layer for a style and image type, without any request text"""
+    config = style_config(style)
+    img = Image.new("RGBA", size, (*config["bg_color"], 255))
+    draw = ImageDraw.Draw(img)
+    if image_type == "logo":
+        _draw_logo_base(draw, style, config)
+    else:
+        _draw_marketing_base(draw, style, config, size)
+    return img
+
+
+class TemplateRegistry:
+    """Base layers rendered once per (style, image_type, size) and shared.
+
+    Templates are never drawn on; callers get a copy. Unknown styles share
+    one template (default colors, generic shapes).
+    """
+
+    def __init__(self):
+        self._templates: Dict[Tuple[str, str, Tuple[int, int]], Image.Image] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, style: str, image_type: str, size: Tuple[int, int] = CANVAS_SIZE
+    ) -> Image.Image:
+        key = (
+            style if style in STYLE_CONFIGS else "other",
+            "logo" if image_type == "logo" else "marketing",
+            size,
+        )
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            return template.copy()
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                self.misses += 1
+                template = render_base_layer(*key)
+                self._templates[key] = template
+        return template.copy()
+
+    def warm(self, size: Tuple[int, int] = CANVAS_SIZE):
+        """Pre-render every style for both image types"""
+        for style in STYLE_CONFIGS:
+            for image_type in ("logo", "marketing"):
+                self.get(style, image_type, size)
+
+    def snapshot(self) -> dict:
+        return {
+            "templates": len(self._templates),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+templates = TemplateRegistry()
+
+
+def _logo_initials(brand_name: str) -> str:
+    initials = "".join([word[0].upper() for word in brand_name.split()[:2]])
+    return initials or brand_name[:2].upper()
+
+
+def _draw_logo_text(
+    img: Image.Image, request: VisualGenerationRequest, style: str, config: dict
+):
+    draw = ImageDraw.Draw(img)
+    brand_name = request.product_description.strip()
+    initials = _logo_initials(brand_name)
+
+    if style == "artistic creative" or style not in STYLE_CONFIGS:
+        # Abstract artistic logo
+        rng = random.Random(hash(brand_name))
+        for _ in range(8):
+            x1 = rng.randint(156, 256)
+            y1 = rng.randint(156, 256)
+            x2 = rng.randint(256, 356)
+            y2 = rng.randint(256, 356)
+            draw.arc([x1, y1, x2, y2], 0, 180, fill=config["accent_color"], width=3)
+
+    font = fonts.get(*LOGO_FONTS.get(style, LOGO_FONTS["artistic creative"]))
+
+    if style == "minimalist clean":
+        bbox = fonts.bbox(initials, font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        draw.text(
+            (256 - text_width // 2, 256 - text_height // 2),
+            initials,
+            fill=config["accent_color"],
+            font=font,
+        )
+    else:
+        fill = config["accent_color"]
+        if style == "bold vibrant":
+            fill = config["text_color"]
+        draw.text((256, 256), initials, fill=fill, font=font, anchor="mm")
+
+    # Add brand name below logo
+    draw.text(
+        (256, 420),
+        brand_name,
+        fill=config["text_color"],
+        font=fonts.get(*BRAND_NAME_FONT),
+        anchor="mt",
+    )
+
+
+def _draw_marketing_text(
+    img: Image.Image, request: VisualGenerationRequest, config: dict
+):
+    draw = ImageDraw.Draw(img)
+    width, height = img.size
+    font = fonts.get(SANS_BOLD, config["font_size"])
+
+    text = request.persona_name
+    bbox = fonts.bbox(text, font)
+    text_width = bbox[2] - bbox[0]
+    draw.text(
+        ((width - text_width) // 2, height - 80),
+        text,
+        fill=config["text_color"],
+        font=font,
+    )
+
+    product_text = (
+        request.product_description[:30] + "..."
+        if len(request.product_description) > 30
+        else request.product_description
+    )
+    small_font = fonts.get(*SMALL_FONT)
+    bbox = fonts.bbox(product_text, small_font)
+    text_width = bbox[2] - bbox[0]
+    draw.text(
+        ((width - text_width) // 2, height - 50),
+        product_text,
+        fill=config["text_color"],
+        font=small_font,
+    )
+
+
+def render_visual(
+    request: VisualGenerationRequest, size: Tuple[int, int] = CANVAS_SIZE
+) -> Image.Image:
+    """Render a logo or marketing visual: cached base layer plus text"""
+    style = request.style_preference
+    config = style_config(style)
+    img = templates.get(style, request.image_type, size)
+    if request.image_type == "logo":
+        _draw_logo_text(img, request, style, config)
+    else:
+        _draw_marketing_text(img, request, config)
+    return img
+
+
+def warm_renderer():
+    """Load every font the renderer uses and pre-render all base layers"""
+    fonts.warm(common_fonts())
+    templates.warm()
+
+
+# Output formats: name -> (PIL format, media type), in default preference order
+IMAGE_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+def available_formats() -> Dict[str, str]:
+    """Output formats this Pillow build can encode, with their media types"""
+    return {
+        name: media_type
+        for name, (pil_format, media_type) in IMAGE_FORMATS.items()
+        if pil_format != "WEBP" or features.check("webp")
+    }
+
+
+def encode_image(
+    img: Image.Image, image_format: str = "png", quality: int = 90
+) -> bytes:
+    """Encode as PNG (lossless, ``quality`` ignored), WebP or JPEG"""
+    pil_format = IMAGE_FORMATS[image_format][0]
+    buffer = io.BytesIO()
+    if pil_format == "PNG":
+        img.save(buffer, format="PNG")
+    else:
+        if pil_format == "JPEG":
+            img = img.convert("RGB")
+        img.save(buffer, format=pil_format, quality=quality)
+    return buffer.getvalue()
+
+
+# Render-pool jobs: module-level so they also run in worker processes
+
+
+def render_image(
+    request: VisualGenerationRequest, image_format: str = "png", quality: int = 90
+) -> bytes:
+    """Render a visual and encode it"""
+    return encode_image(render_visual(request), image_format, quality)
+
+
+def transcode_image(data: bytes, image_format: str = "png", quality: int = 90) -> bytes:
+    """Re-encode image bytes; returned as-is when already PNG and PNG is asked for"""
+    with Image.open(io.BytesIO(data)) as img:
+        if image_format == "png" and img.format == "PNG":
+            return data
+        img.load()
+        return encode_image(img, image_format, quality)
+
+
+def read_image(path: str, image_format: str = "png", quality: int = 90) -> bytes:
+    with open(path, "rb") as f:
+        return transcode_image(f.read(), image_format, quality)
+
+
+def as_base64(job: Callable[..., bytes], *args) -> str:
+    """Run an image job and base64 its output in the same worker"""
+    return base64.b64encode(job(*args)).decode("utf-8")
@@ -0,0 +1,25 @@
+import uuid
+from typing import Optional
+
+from core.configuration.config import settings
+from utils.cache import TTLCache
+
+# Generated visuals (PNG, so any format can be served from them) for
+# delivery=url responses; entries expire like any other cache entry
+visual_store = TTLCache(
+    max_entries=settings.VISUAL_STORE_MAX_ENTRIES, ttl=settings.VISUAL_STORE_TTL
+)
+
+
+def store_visual(png: bytes) -> str:
+    visual_id = uuid.uuid4().hex
+    visual_store.set(visual_id, png)
+    return visual_id
+
+
+def get_visual(visual_id: str) -> Optional[bytes]:
+    return visual_store.get(visual_id)
+
+
+def get_visual_store_stats() -> dict:
+    return visual_store.snapshot()
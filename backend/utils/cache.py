@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def hash_key(payload: Any) -> str:
+    """Stable SHA-256 of a JSON-serialisable payload"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def snapshot(self, size: int, max_entries: int) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": size,
+            "max_entries": max_entries,
+        }
+
+
+class TTLCache:
+    """In-memory cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return self.stats.snapshot(len(self._entries), self.max_entries)
+
+
+class DiskCache:
+    """On-disk JSON cache with TTL and LRU eviction.
+
+    Each entry is one file named after its key; the file mtime doubles as the
+    last-access time, so eviction drops the least recently used files.
+    Every method does blocking file I/O, so async callers run it in a worker
+    thread (see services.result_cache).
+    """
+
+    def __init__(self, directory: str, max_entries: int = 256, ttl: float = 3600):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+
+        if entry.get("expires_at", 0) < time.time():
+            path.unlink(missing_ok=True)
+            self.stats.misses += 1
+            return None
+
+        os.utime(path)
+        self.stats.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        # Unique per writer thread, so concurrent writes of one key never
+        # share a temporary file
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": time.time() + self.ttl, "value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Disk cache write failed: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        files = list(self.directory.glob("*.json"))
+        overflow = len(files) - self.max_entries
+        if overflow <= 0:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:overflow]:
+            path.unlink(missing_ok=True)
+            self.stats.evictions += 1
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def snapshot(self) -> dict:
+        return self.stats.snapshot(
+            len(list(self.directory.glob("*.json"))), self.max_entries
+        )
+
+
+class SQLiteCache:
+    """Persistent string cache backed by SQLite with TTL and size-based
+    eviction. Safe to share between worker processes on the same host."""
+
+    def __init__(self, path: str, max_bytes: int = 50_000_000, ttl: float = 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)"
+            )
+
+    def _connect(self):
+        # One short-lived connection per operation keeps this usable from
+        # worker threads and other processes without extra locking
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] < now:
+                    if row is not None:
+                        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self.stats.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache read failed: {e}")
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value.encode("utf-8")), now + self.ttl, now),
+                )
+                conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"SQLite cache write failed: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM cache ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def snapshot(self) -> dict:
+        try:
+            with self._connect() as conn:
+                count, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+                ).fetchone()
+        except sqlite3.Error:
+            count, size = 0, 0
+        snapshot = self.stats.snapshot(count, 0)
+        snapshot.pop("max_entries")
+        snapshot.update({"bytes": size, "max_bytes": self.max_bytes})
+        return snapshot
@@ -0,0 +1,25 @@
+from contextvars import ContextVar
+from typing import List, Optional
+
+from utils.metrics import FALLBACKS
+
+# Fallbacks served during the current pipeline run. Like the request spans
+# in utils.timing, the list is shared by reference with the tasks the run
+# starts, so fallbacks recorded in any of them are seen by the caller.
+_run_fallbacks: ContextVar[Optional[List[str]]] = ContextVar(
+    "run_fallbacks", default=None
+)
+
+
+def start_fallback_tracking() -> List[str]:
+    fallbacks: List[str] = []
+    _run_fallbacks.set(fallbacks)
+    return fallbacks
+
+
+def record_fallback(kind: str):
+    """Count a fallback and mark the current run as degraded"""
+    FALLBACKS.inc(kind=kind)
+    fallbacks = _run_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(kind)
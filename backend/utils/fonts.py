@@ -0,0 +1,115 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+Font = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
+
+FONT_DIRS = [
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+# Tried in order when a requested font file cannot be found
+FALLBACK_FONTS = ["DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf"]
+
+
+class FontRegistry:
+    """Process-wide cache of loaded fonts and text measurements.
+
+    Each font path is resolved once (the path itself, the same file name in
+    FONT_DIRS, then FALLBACK_FONTS, then PIL's built-in bitmap font) and
+    each (path, size) is loaded once. ``bbox`` caches text bounding boxes
+    per font and text, bounded to ``max_measurements`` entries.
+    """
+
+    def __init__(self, max_measurements: int = 4096):
+        self._paths: Dict[str, Optional[str]] = {}
+        self._fonts: Dict[Tuple[str, int], Font] = {}
+        self._bboxes: "OrderedDict[Tuple[int, str], Tuple[int, int, int, int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.max_measurements = max_measurements
+        self.loads = 0
+        self.measurement_hits = 0
+        self.measurement_misses = 0
+
+    def resolve(self, path: str) -> Optional[str]:
+        """File to load for ``path``, or None to use the built-in font"""
+        if path in self._paths:
+            return self._paths[path]
+
+        candidates: List[str] = [path]
+        name = os.path.basename(path)
+        candidates += [os.path.join(directory, name) for directory in FONT_DIRS]
+        for fallback in FALLBACK_FONTS:
+            candidates += [os.path.join(directory, fallback) for directory in FONT_DIRS]
+
+        resolved = next((c for c in candidates if os.path.isfile(c)), None)
+        if resolved != path:
+            logger.warning(f"Font {path} not found, using {resolved or 'PIL default'}")
+        self._paths[path] = resolved
+        return resolved
+
+    def get(self, path: str, size: int) -> Font:
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            return font
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is None:
+                font = self._load(path, size)
+                self._fonts[key] = font
+        return font
+
+    def _load(self, path: str, size: int) -> Font:
+        resolved = self.resolve(path)
+        self.loads += 1
+        if resolved:
+            try:
+                return ImageFont.truetype(resolved, size)
+            except OSError as e:
+                logger.warning(f"Could not load font {resolved}: {e}")
+        return ImageFont.load_default()
+
+    def bbox(self, text: str, font: Font) -> Tuple[int, int, int, int]:
+        """``textbbox((0, 0), text, font=font)``, cached"""
+        key = (id(font), text)
+        with self._lock:
+            box = self._bboxes.get(key)
+            if box is not None:
+                self._bboxes.move_to_end(key)
+                self.measurement_hits += 1
+                return box
+        box = tuple(int(v) for v in font.getbbox(text))
+        with self._lock:
+            self.measurement_misses += 1
+            self._bboxes[key] = box
+            while len(self._bboxes) > self.max_measurements:
+                self._bboxes.popitem(last=False)
+        return box
+
+    def warm(self, fonts: Iterable[Tuple[str, int]]):
+        for path, size in fonts:
+            self.get(path, size)
+
+    def snapshot(self) -> dict:
+        return {
+            "fonts": len(self._fonts),
+            "loads": self.loads,
+            "measurements": len(self._bboxes),
+            "measurement_hits": self.measurement_hits,
+            "measurement_misses": self.measurement_misses,
+        }
+
+
+fonts = FontRegistry()
@@ -0,0 +1,180 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Outcomes reported by IncrementalJSONParser.result
+CLEAN = "clean"  # the text parsed as-is
+REPAIRED = "repaired"  # truncated after a whole value, containers closed
+SALVAGED = "salvaged"  # truncated mid-value, cut back to the last whole value
+FAILED = "failed"
+
+# Text that can end a complete JSON value; a truncated response ending in
+# anything else (an open string, a number that may be cut short) is rolled
+# back rather than closed off
+_VALUE_ENDINGS = ('"', "}", "]", "true", "false", "null")
+
+
+class IncrementalJSONParser:
+    """Tolerant JSON parser fed one chunk at a time.
+
+    Skips any prose or markdown fence before the first opener (``{`` or
+    ``[`` by default; pass ``openers="{"`` when an object is expected) and
+    tracks string/escape state and the open container stack as text arrives.
+    After every complete value it records a checkpoint. A truncated response
+    that stops right after a complete value is repaired by closing the open
+    containers; one that stops inside a value (an unterminated string, a
+    number) is salvaged by cutting back to the last complete value, so a
+    cut-off string is never returned as if it were whole. ``max_open`` caps
+    how many containers may be closed off: with 1, only the top-level value
+    may be cut short and any nested list or object must be complete. Text
+    after the top-level value closes is ignored.
+    """
+
+    def __init__(self, openers: str = "{[", max_open: Optional[int] = None):
+        self.openers = openers
+        self.max_open = max_open
+        self._text: List[str] = []
+        self._length = 0
+        # Characters fed so far, and how many had been fed when the
+        # top-level value closed
+        self.fed = 0
+        self.end_offset: Optional[int] = None
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._stack: List[str] = []
+        # (length of text up to the checkpoint, open containers at that point)
+        self._checkpoints: List[Tuple[int, Tuple[str, ...]]] = []
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level value has been closed"""
+        return self._done
+
+    def feed(self, chunk: str):
+        for char in chunk:
+            if self._done:
+                return
+            self.fed += 1
+            if not self._started:
+                if char not in self.openers:
+                    continue
+                self._started = True
+            self._consume(char)
+            if self._done:
+                self.end_offset = self.fed
+
+    def _consume(self, char: str):
+        self._text.append(char)
+        self._length += 1
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return
+
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._stack.append("}" if char == "{" else "]")
+            self._checkpoints.append((self._length, tuple(self._stack)))
+        elif char in "}]":
+            if self._stack:
+                self._stack.pop()
+            if not self._stack:
+                self._done = True
+            else:
+                self._checkpoints.append((self._length, tuple(self._stack)))
+        elif char == ",":
+            self._checkpoints.append((self._length - 1, tuple(self._stack)))
+
+    def result(self) -> Tuple[Optional[Any], str]:
+        """Best parse of the text seen so far and how it was obtained"""
+        if not self._started:
+            return None, FAILED
+        text = "".join(self._text)
+
+        if self._done:
+            try:
+                return json.loads(text), CLEAN
+            except ValueError:
+                pass
+
+        # Stopped right after a complete value: close the open containers
+        if (
+            not self._in_string
+            and self._may_close(self._stack)
+            and text.rstrip().endswith(_VALUE_ENDINGS)
+        ):
+            try:
+                return json.loads(text + "".join(reversed(self._stack))), REPAIRED
+            except ValueError:
+                pass
+
+        # Cut back to the most recent point where every value was complete
+        for length, stack in reversed(self._checkpoints):
+            if not self._may_close(stack):
+                continue
+            candidate = text[:length].rstrip().rstrip(",")
+            try:
+                return json.loads(candidate + "".join(reversed(stack))), SALVAGED
+            except ValueError:
+                continue
+        return None, FAILED
+
+    def _may_close(self, stack) -> bool:
+        return self.max_open is None or len(stack) <= self.max_open
+
+
+def parse_json(
+    text: str, openers: str = "{[", max_open: Optional[int] = None
+) -> Tuple[Optional[Any], str]:
+    """Parse the JSON value in ``text``. If the first value closes but is not
+    valid JSON (prose such as "here is [the] json: {...}"), scanning resumes
+    after it, and its salvaged form is only used if nothing later parses."""
+    text = text or ""
+    fallback: Tuple[Optional[Any], str] = (None, FAILED)
+    start = 0
+    while True:
+        parser = IncrementalJSONParser(openers, max_open)
+        parser.feed(text[start:])
+        value, outcome = parser.result()
+        if outcome in (CLEAN, REPAIRED):
+            return value, outcome
+        if fallback[1] == FAILED:
+            fallback = (value, outcome)
+        if parser.end_offset is None:
+            return fallback
+        start += parser.end_offset
+
+
+def missing_fields(data: Dict[str, Any], fields: Iterable[str]) -> List[str]:
+    """Names in ``fields`` (a schema or a list of names) absent from ``data``
+    after ``validate_fields``"""
+    return [name for name in fields if name not in data]
+
+
+def validate_fields(data: Dict[str, Any], schema: Dict[str, type]) -> Dict[str, Any]:
+    """Keep the fields that match ``schema`` (name -> ``str`` or ``list`` of
+    strings); a field of the wrong type is dropped rather than failing the
+    whole object, so callers can fill it with a default."""
+    valid = {}
+    for name, expected in schema.items():
+        value = data.get(name)
+        if expected is str and isinstance(value, str) and value.strip():
+            valid[name] = value.strip()
+        elif expected is list and isinstance(value, list):
+            items = [
+                str(item) for item in value if isinstance(item, (str, int, float))
+            ]
+            if items:
+                valid[name] = items
+    # Keep fields outside the schema (e.g. cluster_id) untouched
+    for name, value in data.items():
+        if name not in schema:
+            valid[name] = value
+    return valid
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Optional
+
+from utils.metrics import EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how long the event loop is blocked.
+
+    Sleeps for ``interval`` seconds in a loop; whatever it wakes up late by
+    is time the loop spent running something else without yielding (e.g.
+    synchronous rendering in a handler). Lags above ``warn_after`` are
+    logged.
+    """
+
+    def __init__(self, interval: float, warn_after: float = 0.25):
+        self.interval = interval
+        self.warn_after = warn_after
+        self._task: Optional[asyncio.Task] = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag > self.warn_after:
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms")
+
+    def snapshot(self) -> dict:
+        return {
+            "interval": self.interval,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
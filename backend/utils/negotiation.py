@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_accept(header: str) -> List[Tuple[str, float]]:
+    """Media ranges and their q-values from an Accept header"""
+    ranges = []
+    for part in header.split(","):
+        media_range, *params = [piece.strip() for piece in part.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range.lower(), q))
+    return ranges
+
+
+def negotiate(accept: Optional[str], offers: Dict[str, str]) -> Optional[str]:
+    """Pick the offer (name -> media type, in server preference order) the
+    client accepts best, or None if it accepts none of them.
+
+    Each offer takes the q-value of its most specific matching range
+    (``image/png`` over ``image/*`` over ``*/*``). Ties go to the more
+    specific match, then to the earlier offer. A missing or empty header
+    accepts anything.
+    """
+    if not accept or not accept.strip():
+        return next(iter(offers), None)
+
+    ranges = parse_accept(accept)
+    best: Optional[Tuple[float, int, int]] = None
+    chosen = None
+    for index, (name, media_type) in enumerate(offers.items()):
+        main_type = media_type.split("/")[0]
+        match: Optional[Tuple[int, float]] = None
+        for media_range, q in ranges:
+            if media_range == media_type:
+                specificity = 2
+            elif media_range == f"{main_type}/*":
+                specificity = 1
+            elif media_range == "*/*":
+                specificity = 0
+            else:
+                continue
+            if match is None or specificity > match[0]:
+                match = (specificity, q)
+        if match is None or match[1] <= 0:
+            continue
+        rank = (match[1], match[0], -index)
+        if best is None or rank > best:
+            best, chosen = rank, name
+    return chosen
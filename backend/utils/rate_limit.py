@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from a rate-limit header: ``"2"``, ``"1.5s"``, ``"6m0s"``,
+    ``"120ms"``; None when missing or unparseable"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Delay requested by ``Retry-After`` / ``retry-after-ms`` (seconds only,
+    HTTP dates are ignored)"""
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``capacity`` per minute"""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(
+            self.capacity, self.level + (now - self.updated) * self.capacity / 60
+        )
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+
+class RateLimitScheduler:
+    """Process-wide requests-per-minute and tokens-per-minute scheduler.
+
+    Callers ``acquire`` a request and an estimated token cost before calling
+    the upstream; calls queue in FIFO order until both buckets can cover
+    them, instead of being sent and failing with 429. ``reconcile`` corrects
+    the token bucket once the real usage is known, ``observe_headers`` syncs
+    the buckets down to the provider's ``x-ratelimit-remaining-*`` headers,
+    and ``pause`` (fed by ``Retry-After``) holds the whole queue. A limit of
+    0 disables that bucket.
+    """
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int):
+        self.name = name
+        self.requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.pauses = 0
+
+    def _wait_time(self, tokens: float) -> float:
+        now = time.monotonic()
+        wait = max(0.0, self.paused_until - now)
+        if self.requests:
+            self.requests.refill(now)
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens:
+            self.tokens.refill(now)
+            wait = max(wait, self.tokens.wait_time(self._charge(tokens)))
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait for capacity for one request of ``tokens``; returns the wait"""
+        start = time.monotonic()
+        self.queue_depth += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            # The lock is FIFO, so only the head of the queue polls the buckets
+            async with self._lock:
+                while True:
+                    wait = self._wait_time(tokens)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                if self.requests:
+                    self.requests.level -= 1
+                if self.tokens:
+                    self.tokens.level -= self._charge(tokens)
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if waited > 0.001:
+            self.throttled += 1
+        return waited
+
+    def _charge(self, tokens: float) -> float:
+        # A call larger than the whole bucket is charged one full bucket so
+        # it can still go through
+        return min(tokens, self.tokens.capacity)
+
+    def reconcile(self, estimated: int, actual: int):
+        """Refund or charge the difference between what ``acquire`` debited
+        for ``estimated`` tokens and the real usage"""
+        if self.tokens:
+            self.tokens.level = min(
+                self.tokens.capacity,
+                self.tokens.level + self._charge(estimated) - actual,
+            )
+
+    def pause(self, seconds: float):
+        """Hold every queued call for ``seconds`` (e.g. after a 429)"""
+        until = time.monotonic() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            self.pauses += 1
+            logger.warning(f"{self.name} rate limited, pausing for {seconds:.2f}s")
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]):
+        """Sync with the provider's view of the limits"""
+        if not headers:
+            return
+        now = time.monotonic()
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if bucket:
+                bucket.refill(now)
+                bucket.level = min(bucket.level, remaining)
+            if remaining <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.pause(reset)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "requests_per_minute": self.requests.capacity if self.requests else 0,
+            "tokens_per_minute": self.tokens.capacity if self.tokens else 0,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait_seconds": round(self.total_wait / self.acquired, 4)
+            if self.acquired
+            else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+            "pauses": self.pauses,
+            "paused_for_seconds": round(max(0.0, self.paused_until - now), 3),
+        }
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """Per-upstream circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout`` seconds. After that it is half-open: one trial call
+    goes through while the rest keep being rejected, and the trial's success
+    closes it while a failure opens it again. A trial that never reports an
+    outcome is replaced by a new one after another ``reset_timeout``.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._open = False
+        # When the current half-open trial call was let through
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if not self._open:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            now = time.monotonic()
+            if (
+                self._trial_started is None
+                or now - self._trial_started >= self.reset_timeout
+            ):
+                self._trial_started = now
+                return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self):
+        if self._open:
+            logger.info(f"Circuit breaker '{self.name}' closed")
+        self._open = False
+        self._trial_started = None
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or (
+            not self._open and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open = True
+            self._trial_started = None
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit breaker '{self.name}' opened after "
+                f"{self.consecutive_failures} consecutive failures"
+            )
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "trial_in_flight": self._trial_started is not None,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+        }
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt"""
+    return random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+async def retry_async(
+    operation: Callable[[], Awaitable[T]],
+    is_retryable: Callable[[Exception], bool],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float,
+    description: str = "upstream call",
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """Run ``operation``, retrying retryable failures with jittered backoff.
+
+    With a ``breaker``, every retry must pass ``breaker.allow()``; once the
+    breaker has opened (or a half-open trial is already running) the last
+    error is raised instead of retrying.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(
+                f"{description} failed ({e}), retry {attempt + 1}/{max_retries} "
+                f"in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            if breaker is not None and not breaker.allow():
+                logger.warning(
+                    f"{description}: circuit breaker '{breaker.name}' is "
+                    f"{breaker.state}, not retrying"
+                )
+                raise
+            attempt += 1
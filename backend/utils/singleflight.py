@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls that share a key into one computation.
+
+    The first caller for a key starts ``operation`` as a task; callers that
+    arrive while it is running wait on the same task and get the same result
+    or exception. Waiters are shielded from each other: cancelling one (e.g.
+    a disconnected client) never cancels the shared task, which always runs
+    to completion so its side effects (such as filling a cache) still happen
+    for the retry that usually follows.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call[T]] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, operation: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(operation()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, task))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            logger.info(
+                f"{self.name}: joined in-flight call ({call.waiters} already waiting)"
+            )
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key: str, task: asyncio.Task):
+        call = self._calls.get(key)
+        if call is not None and call.task is task:
+            del self._calls[key]
+        # Mark the exception retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "waiters": sum(call.waiters for call in self._calls.values()),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
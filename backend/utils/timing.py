@@ -0,0 +1,79 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.duration_ms = 0.0
+
+
+# Spans recorded for the current request; tasks spawned by the request share
+# the same list because asyncio copies the context on task creation
+_request_spans: ContextVar[Optional[List[Span]]] = ContextVar(
+    "request_spans", default=None
+)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def start_request_timing() -> List[Span]:
+    spans: List[Span] = []
+    _request_spans.set(spans)
+    return spans
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a pipeline stage and log it as a structured span.
+
+    ``label`` becomes the Server-Timing description; any other attributes
+    (upstream status, fallback, ...) go to the log line. Use annotate_span to
+    add attributes from deeper in the call stack.
+    """
+    current = Span(name, attrs)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append(current)
+        logger.info(
+            json.dumps(
+                {"span": name, "duration_ms": round(current.duration_ms, 2), **attrs},
+                default=str,
+            )
+        )
+
+
+def annotate_span(**attrs):
+    """Attach attributes to the innermost active span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def format_server_timing(spans: List[Span], total_ms: Optional[float] = None) -> str:
+    entries = []
+    for recorded in spans:
+        entry = f"{recorded.name};dur={recorded.duration_ms:.1f}"
+        label = recorded.attrs.get("label")
+        if label is not None:
+            entry += f';desc="{str(label).replace(chr(34), "")}"'
+        entries.append(entry)
+    if total_ms is not None:
+        entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
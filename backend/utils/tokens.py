@@ -0,0 +1,39 @@
+import math
+import re
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character estimate
+    _encoding = None
+
+# Average characters per token for English prose with GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text``, exact with tiktoken, estimated otherwise"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_text(text: str, max_tokens: int) -> str:
+    """Shorten ``text`` to roughly ``max_tokens``, cutting at a sentence
+    boundary where possible"""
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    if _encoding is not None:
+        truncated = _encoding.decode(_encoding.encode(text)[:max_tokens])
+    else:
+        truncated = text[: max_tokens * CHARS_PER_TOKEN]
+
+    sentence_end = max(truncated.rfind(p) for p in (". ", "! ", "? "))
+    if sentence_end > len(truncated) // 2:
+        return truncated[: sentence_end + 1]
+    return truncated.rsplit(" ", 1)[0] + "..."
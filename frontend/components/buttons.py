@@ -1,3 +1,4 @@
+import json
 import requests
 import streamlit as st
 import time
@@ -23,11 +24,9 @@ def generate_btn(
                     "AI is analyzing your product and generating insights..."
                 ):
 
-                    # Progress bar
+                    # Progress bar driven by pipeline events
                     progress_bar = st.progress(0)
-                    for i in range(100):
-                        time.sleep(0.01)
-                        progress_bar.progress(i + 1)
+                    status = st.empty()
 
                     # API Call
                     request_data = {
@@ -39,24 +38,70 @@ def generate_btn(
                     }
 
                     try:
-                        response = requests.post(
-                            f"{API_URL}/api/generate-targeting",
-                            json=request_data,
-                            timeout=60,
+                        generated_data = stream_targeting(
+                            API_URL, request_data, progress_bar, status
                         )
 
-                        if response.status_code == 200:
-                            st.session_state.generated_data = response.json()
+                        if generated_data:
+                            st.session_state.generated_data = generated_data
                             st.success("Success! Your audience intelligence is ready.")
                             time.sleep(1)
                             st.session_state.current_page = "insights"
                             st.rerun()
-                        else:
-                            st.error(
-                                f"Error: {response.status_code}. Please try again."
-                            )
 
                     except Exception as e:
                         st.error(
                             "Connection failed. Please check your internet connection and try again."
                         )
+
+
+def stream_targeting(API_URL, request_data, progress_bar, status):
+    """Consume the SSE targeting stream, updating progress as events arrive.
+
+    Returns the final TasteTargetResponse payload, or None on error (after
+    showing the error, so callers must not report it again).
+    """
+    response = requests.post(
+        f"{API_URL}/api/generate-targeting/stream",
+        json=request_data,
+        stream=True,
+        timeout=(10, 60),
+    )
+    if response.status_code != 200:
+        st.error(f"Error: {response.status_code}. Please try again.")
+        return None
+
+    total = 1
+    personas = copies = 0
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+            continue
+        if not line.startswith("data: "):
+            continue
+
+        data = json.loads(line[len("data: "):])
+        if event == "clusters":
+            total = max(1, len(data))
+            status.info(f"Found {len(data)} taste clusters")
+            progress_bar.progress(10)
+        elif event == "persona":
+            personas += 1
+            status.info(f"Persona ready: {data['name']}")
+        elif event == "copy":
+            copies += 1
+        elif event == "suggestions":
+            status.info("Building strategic suggestions")
+        elif event == "done":
+            progress_bar.progress(100)
+            return data
+        elif event == "error":
+            st.error(f"Error: {data.get('detail', 'generation failed')}")
+            return None
+
+        if event in ("persona", "copy"):
+            progress_bar.progress(10 + int(85 * (personas + copies) / (2 * total)))
+
+    st.error("Error: generation did not finish. Please try again.")
+    return None